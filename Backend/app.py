@@ -1,26 +1,43 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import itertools
 import json
 import logging
+import mmap
 import os
+import re
 import sys
+import threading
 import time
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from email.utils import formatdate
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
-import requests
-from fastapi import FastAPI, HTTPException
+import anyio.to_thread
+import httpx
+import numpy as np
+import orjson
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field, field_validator
 
+# Resolve this file once; every project path derives from it
+_HERE = Path(__file__).resolve()
+BACKEND_DIR = _HERE.parent
+BASE_DIR = BACKEND_DIR.parent
+
 # Load environment variables from .env file
 try:
     from dotenv import load_dotenv
-    BASE_DIR_TEMP = Path(__file__).resolve().parent.parent
-    env_path = BASE_DIR_TEMP / ".env"
+    env_path = BASE_DIR / ".env"
     if env_path.exists():
         load_dotenv(env_path)
         print(f"✓ Loaded environment from {env_path}")
@@ -29,9 +46,9 @@ except ImportError:
     pass
 
 # Add parent directory to path for llm module import
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from llm import get_embeddings, generate_answer, LLMServiceError
-from catalog import CatalogBuilder
+sys.path.insert(0, str(BASE_DIR))
+from llm import get_embeddings, generate_answer, generate_answer_stream, LLMServiceError
+from catalog import CatalogBuilder, TermMatcher
 from retrieval import QueryClassifier, CatalogRetriever
 
 try:
@@ -50,8 +67,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-STATIC_DIR = Path(__file__).resolve().parent / "static"
+STATIC_DIR = BACKEND_DIR / "static"
 OUTPUT_DIR = BASE_DIR / "output"
 INDEX_DIR = OUTPUT_DIR / "vector_index"
 CATALOG_DIR = OUTPUT_DIR / "catalog"
@@ -64,6 +80,20 @@ DEFAULT_TOP_K = int(os.environ.get("DEFAULT_TOP_K", "5"))
 SIMILARITY_THRESHOLD = float(os.environ.get("SIMILARITY_THRESHOLD", "0.7"))
 RETRY_PAUSE = 2.0
 
+# Query caching: exact-match embedding cache + semantic (near-duplicate) result cache.
+# Set SEMANTIC_CACHE_TAU=0 to disable the semantic result cache.
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "4096"))
+CLASSIFY_CACHE_SIZE = int(os.environ.get("CLASSIFY_CACHE_SIZE", "1024"))
+SEMANTIC_CACHE_TAU = float(os.environ.get("SEMANTIC_CACHE_TAU", "0.95"))
+SEMANTIC_CACHE_SIZE = int(os.environ.get("SEMANTIC_CACHE_SIZE", "2048"))
+
+# Dynamic batching of concurrent query embeddings
+EMBED_BATCH_MAX_SIZE = int(os.environ.get("EMBED_BATCH_MAX_SIZE", "32"))
+EMBED_BATCH_MAX_DELAY = float(os.environ.get("EMBED_BATCH_MAX_DELAY", "0.02"))
+
+# Worker threads for blocking I/O (ChromaDB, LLM calls, file reads)
+THREAD_POOL_SIZE = int(os.environ.get("THREAD_POOL_SIZE", "64"))
+
 
 class QueryPayload(BaseModel):
     query: str = Field(
@@ -73,6 +103,9 @@ class QueryPayload(BaseModel):
     threshold: Optional[float] = Field(
         None, ge=0.0, le=1.0, description="Optional similarity threshold override (0-1)."
     )
+    stream: bool = Field(
+        False, description="Stream the response as server-sent events (meta, answer deltas, done)."
+    )
 
     @field_validator("query")
     @classmethod
@@ -90,13 +123,226 @@ class QueryPayload(BaseModel):
 
 @dataclass
 class RetrievalResult:
+    # Explicit __slots__ (no field defaults) instead of slots=True, which needs Python 3.10
+    __slots__ = ("id", "text", "metadata", "score")
+
     id: str
     text: str
-    metadata: Dict[str, str]
+    metadata: Dict[str, object]
     score: float
 
 
-app = FastAPI(title="Semantic Query Agent", version="1.0.0")
+class SemanticQueryCache:
+    """Ring buffer of recent query embeddings and their vector search results.
+
+    A query whose embedding has cosine similarity >= ``tau`` with a cached
+    query reuses that query's results instead of searching the collection again.
+    """
+
+    def __init__(self, capacity: int, tau: float):
+        self.capacity = capacity
+        self.tau = tau
+        self._vectors: Optional[np.ndarray] = None  # shape (capacity, dim), float32
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        self._top_ks = np.zeros(capacity, dtype=np.int64)
+        self._entries: List[Optional[Tuple[Optional[str], int, List[RetrievalResult]]]] = [None] * capacity
+        self._next_slot = 0
+        self._lock = threading.Lock()
+
+    def lookup(
+        self, embedding: Sequence[float], top_k: int, scope: Optional[str] = None
+    ) -> Optional[List[RetrievalResult]]:
+        """Return copies of cached results for a near-duplicate query, or None on miss.
+
+        ``scope`` identifies the metadata filter the results were searched with;
+        entries only match queries with the same scope.
+        """
+        query_vec = np.asarray(embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query_vec))
+        if query_norm == 0.0:
+            return None
+
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != query_vec.shape[0]:
+                return None
+            sims = self._scoped_similarities(query_vec, query_norm, scope)
+            # Entries with too few results can't answer this query
+            sims[self._top_ks < top_k] = -np.inf
+            slot = int(np.argmax(sims))
+            if sims[slot] < self.tau:
+                return None
+            entry = self._entries[slot]
+
+        # Copy so callers can re-score without touching the cached results
+        return [replace(item) for item in entry[2][:top_k]]
+
+    def store(
+        self,
+        embedding: Sequence[float],
+        top_k: int,
+        results: List[RetrievalResult],
+        scope: Optional[str] = None,
+    ) -> None:
+        """Cache results for a query.
+
+        Replaces a same-scope entry for a near-duplicate query if there is
+        one; otherwise takes the next slot, evicting the oldest when full.
+        """
+        query_vec = np.asarray(embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query_vec))
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, query_vec.shape[0]), dtype=np.float32)
+            elif self._vectors.shape[1] != query_vec.shape[0]:
+                return
+            slot = -1
+            if query_norm > 0.0:
+                sims = self._scoped_similarities(query_vec, query_norm, scope)
+                best = int(np.argmax(sims))
+                if sims[best] >= self.tau:
+                    slot = best
+            if slot < 0:
+                slot = self._next_slot
+                self._next_slot = (slot + 1) % self.capacity
+            self._vectors[slot] = query_vec
+            self._norms[slot] = query_norm
+            self._top_ks[slot] = top_k
+            self._entries[slot] = (scope, top_k, [replace(item) for item in results])
+
+    def _scoped_similarities(
+        self, query_vec: np.ndarray, query_norm: float, scope: Optional[str]
+    ) -> np.ndarray:
+        """Cosine similarity to every slot, -inf for empty slots and other scopes."""
+        sims = (self._vectors @ query_vec) / (self._norms * query_norm + 1e-12)
+        for slot, entry in enumerate(self._entries):
+            if entry is None or entry[0] != scope:
+                sims[slot] = -np.inf
+        return sims
+
+
+semantic_cache: Optional[SemanticQueryCache] = None
+if 0.0 < SEMANTIC_CACHE_TAU <= 1.0 and SEMANTIC_CACHE_SIZE > 0:
+    semantic_cache = SemanticQueryCache(SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_TAU)
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding requests into batched ``get_embeddings`` calls.
+
+    Requests arriving within ``max_delay`` seconds of the first queued request are
+    sent to the provider together (up to ``max_batch_size`` texts per call).
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_delay: float = 0.02):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay = max(0.0, max_delay)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        self._queue = None
+
+    async def embed(self, text: str) -> List[float]:
+        """Queue a text for embedding and wait for its batch to complete."""
+        if not self.running:
+            return (await asyncio.to_thread(get_embeddings, [text]))[0]
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await asyncio.to_thread(get_embeddings, texts)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            logger.debug(f"Embedded batch of {len(texts)} queries")
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+
+embedding_batcher = EmbeddingBatcher(EMBED_BATCH_MAX_SIZE, EMBED_BATCH_MAX_DELAY)
+
+# Shared keep-alive pool for outbound web search requests
+_http = httpx.AsyncClient(
+    http2=True,
+    timeout=30,
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+)
+
+
+def warm_collection() -> None:
+    """Run a throwaway query so Chroma loads the HNSW index before the first request."""
+    try:
+        count = collection.count()
+        if not count:
+            return
+        # Take the dimension from a stored vector so warm-up needs no embedding call
+        sample = collection.get(limit=1, include=["embeddings"])
+        dim = len(sample["embeddings"][0])
+        collection.query(query_embeddings=[[0.0] * dim], n_results=1, include=["distances"])
+        logger.info(f"✓ Vector collection warmed ({count} chunks)")
+    except Exception as exc:
+        logger.warning(f"⚠ Vector collection warm-up failed: {exc}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # asyncio.to_thread uses the loop's default executor; sync endpoints use anyio's limiter
+    executor = ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix="io")
+    asyncio.get_running_loop().set_default_executor(executor)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREAD_POOL_SIZE
+
+    await asyncio.to_thread(warm_collection)
+
+    embedding_batcher.start()
+    try:
+        yield
+    finally:
+        await embedding_batcher.stop()
+        await _http.aclose()
+        executor.shutdown(wait=False)
+
+
+app = FastAPI(
+    title="Semantic Query Agent",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # CORS configuration - use environment variable for allowed origins
 # For production, set CORS_ORIGINS="https://yourdomain.com,https://app.yourdomain.com"
@@ -119,19 +365,26 @@ app.add_middleware(
 
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
+# One directory listing instead of an exists() probe per optional output dir
+try:
+    with os.scandir(OUTPUT_DIR) as entries:
+        _output_subdirs = {entry.name for entry in entries if entry.is_dir()}
+except FileNotFoundError:
+    _output_subdirs = set()
+
 # Mount images directory to serve embedded images from chunks
 IMAGE_DIR = OUTPUT_DIR / "images"
-if IMAGE_DIR.exists():
+if "images" in _output_subdirs:
     app.mount("/images", StaticFiles(directory=IMAGE_DIR), name="images")
 
 # Mount articles directory to serve catalog articles with images
-ARTICLES_DIR = OUTPUT_DIR / "catalog" / "articles"
-if ARTICLES_DIR.exists():
+ARTICLES_DIR = CATALOG_DIR / "articles"
+if "catalog" in _output_subdirs and ARTICLES_DIR.is_dir():
     app.mount("/articles", StaticFiles(directory=ARTICLES_DIR), name="articles")
 
 # Mount md directory to serve markdown documents and their images
 MD_DIR = BASE_DIR / "md"
-if MD_DIR.exists():
+if MD_DIR.is_dir():
     app.mount("/md", StaticFiles(directory=MD_DIR), name="md")
 
 client: ClientAPI = chromadb.PersistentClient(path=str(INDEX_DIR))
@@ -145,9 +398,10 @@ catalog_builder = None
 query_classifier = None
 catalog_retriever = None
 
-if CATALOG_DIR.exists() and (CATALOG_DIR / "catalog.json").exists():
+if "catalog" in _output_subdirs and (CATALOG_DIR / "catalog.json").exists():
     try:
         catalog_builder = CatalogBuilder(CATALOG_DIR)
+        catalog_builder.term_matcher  # compile synonym/code automata up front
         query_classifier = QueryClassifier()
         catalog_retriever = CatalogRetriever(
             collection,
@@ -165,25 +419,93 @@ else:
     logger.warning("  Run 'python Ingress/build_catalog.py' to enable Phase 2 features")
 
 
+# Exact-match embedding cache (LRU), keyed on the whitespace-normalized query
+_embedding_cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+
+
 # Embedding function now uses centralized llm service
-def embed_text(text: str) -> List[float]:
-    """Embed a single text using the centralized LLM service."""
+async def embed_text(text: str) -> List[float]:
+    """Embed a single text, reusing the embedding of identical (whitespace-normalized) queries."""
+    key = " ".join(text.split())
+    cached = _embedding_cache.get(key)
+    if cached is not None:
+        _embedding_cache.move_to_end(key)
+        return list(cached)
+
     try:
-        return get_embeddings([text])[0]
+        embedding = await embedding_batcher.embed(key)
     except LLMServiceError as exc:
         logger.error(f"Failed to embed text: {exc}")
         raise RuntimeError(f"Failed to fetch embedding: {exc}") from exc
 
+    if EMBEDDING_CACHE_SIZE > 0:
+        _embedding_cache[key] = tuple(embedding)
+        if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+    return list(embedding)
+
+
+_classification_cache: "OrderedDict[str, Dict]" = OrderedDict()
 
-def query_vector_store(
+
+async def classify_query(query: str) -> Dict:
+    """Classify a query, reusing the result for identical (whitespace-normalized) queries."""
+    key = " ".join(query.split())
+    cached = _classification_cache.get(key)
+    if cached is not None:
+        _classification_cache.move_to_end(key)
+        return dict(cached)
+
+    classification = await asyncio.to_thread(query_classifier.classify, key)
+
+    # Zero confidence is the classifier's fallback after an LLM error; don't pin it
+    if CLASSIFY_CACHE_SIZE > 0 and classification.get("confidence", 0.0) > 0.0:
+        _classification_cache[key] = dict(classification)
+        if len(_classification_cache) > CLASSIFY_CACHE_SIZE:
+            _classification_cache.popitem(last=False)
+    return classification
+
+
+async def query_vector_store(
     query: str,
     top_k: int,
     threshold: float,
+    where: Optional[Dict] = None,
+) -> Tuple[List[RetrievalResult], float]:
+    """Search the collection, optionally prefiltered by a Chroma ``where`` filter.
+
+    If the filtered search keeps nothing above ``threshold``, the search is
+    repeated without the filter.
+    """
+    embedding = await embed_text(query)
+
+    retrieved, best_score = await search_collection(embedding, top_k, threshold, where)
+    if where is not None and not retrieved:
+        logger.info(f"No chunks passed the threshold with filter {where}, retrying unfiltered")
+        retrieved, best_score = await search_collection(embedding, top_k, threshold)
+    return retrieved, best_score
+
+
+async def search_collection(
+    embedding: List[float],
+    top_k: int,
+    threshold: float,
+    where: Optional[Dict] = None,
 ) -> Tuple[List[RetrievalResult], float]:
-    embedding = embed_text(query)
-    result = collection.query(
+    scope = json.dumps(where, sort_keys=True) if where is not None else None
+
+    if semantic_cache:
+        cached = semantic_cache.lookup(embedding, top_k, scope)
+        if cached is not None:
+            logger.debug("Semantic cache hit, skipping vector store query")
+            best_score = max((item.score for item in cached), default=0.0)
+            return [item for item in cached if item.score >= threshold], best_score
+
+    result = await asyncio.to_thread(
+        collection.query,
         query_embeddings=[embedding],
         n_results=top_k,
+        where=where,
         include=["distances", "documents", "metadatas"],
     )
     documents = result.get("documents") or [[]]
@@ -191,22 +513,22 @@ def query_vector_store(
     ids = result.get("ids") or [[]]
     distances = result.get("distances") or [[]]
 
-    retrieved: List[RetrievalResult] = []
-    best_score = 0.0
-    for doc, meta, distance, chunk_id in zip(
-        documents[0], metadatas[0], distances[0], ids[0]
-    ):
-        similarity = 1 - float(distance)
-        best_score = max(best_score, similarity)
-        metadata = {str(k): str(v) for k, v in (meta or {}).items()}
-        retrieved.append(
-            RetrievalResult(
-                id=str(chunk_id),
-                text=str(doc),
-                metadata=metadata,
-                score=similarity,
-            )
+    scores = 1.0 - np.asarray(distances[0], dtype=np.float64)
+    best_score = float(scores.max()) if scores.size else 0.0
+    retrieved = [
+        RetrievalResult(
+            id=str(chunk_id),
+            text=str(doc),
+            # Chroma metadata already has str keys; build_context_block handles non-str values
+            metadata=meta if isinstance(meta, dict) else {},
+            score=similarity,
+        )
+        for doc, meta, similarity, chunk_id in zip(
+            documents[0], metadatas[0], scores.tolist(), ids[0]
         )
+    ]
+    if semantic_cache:
+        semantic_cache.store(embedding, top_k, retrieved, scope)
     filtered = [item for item in retrieved if item.score >= threshold]
     return filtered, best_score
 
@@ -214,60 +536,50 @@ def query_vector_store(
 def boost_scores_by_synonyms_and_codes(
     query: str,
     results: List[RetrievalResult],
-    catalog_data: Dict,
+    term_matcher: TermMatcher,
+    best_score: float,
     boost_factor: float = 0.15
-) -> List[RetrievalResult]:
+) -> Tuple[List[RetrievalResult], float]:
     """Boost scores for results matching query synonyms or codes.
 
     Args:
         query: User query string
         results: List of retrieval results
-        catalog_data: Catalog JSON data with article metadata
+        term_matcher: Compiled matcher over catalog synonyms and codes
+        best_score: Best similarity before boosting
         boost_factor: How much to boost matching scores (default: 0.15)
 
     Returns:
-        Updated list of results with boosted scores
+        Tuple of (updated list of results with boosted scores, best score after boosting)
     """
-    if not catalog_data or "articles" not in catalog_data:
-        return results
-
-    query_lower = query.lower()
-    query_upper = query.upper()
-    articles = catalog_data.get("articles", {})
-
-    for result in results:
-        article_id = result.metadata.get("article_id")
-        if not article_id or article_id not in articles:
-            continue
-
-        article_meta = articles[article_id]
-        synonyms = article_meta.get("synonyms", [])
-        codes = article_meta.get("codes", [])
-
-        # Check synonym matches (case-insensitive)
-        synonym_match = any(
-            syn.lower() in query_lower
-            for syn in synonyms
+    synonym_ids, code_ids = term_matcher.match(query)
+    if not results or (not synonym_ids and not code_ids):
+        return results, best_score
+
+    article_ids = [result.metadata.get("article_id") for result in results]
+    synonym_mask = np.fromiter((a in synonym_ids for a in article_ids), dtype=bool, count=len(results))
+    code_mask = np.fromiter((a in code_ids for a in article_ids), dtype=bool, count=len(results))
+    boost_mask = synonym_mask | code_mask
+    if not boost_mask.any():
+        return results, best_score
+
+    # Boost matching scores, capped at 1.0
+    scores = np.fromiter((r.score for r in results), dtype=np.float64, count=len(results))
+    boosted = np.minimum(scores + boost_factor * boost_mask, 1.0)
+
+    for i in np.flatnonzero(boost_mask).tolist():
+        logger.debug(
+            f"Boosted {article_ids[i]}: {scores[i]:.3f} → {boosted[i]:.3f} "
+            f"(synonym={bool(synonym_mask[i])}, code={bool(code_mask[i])})"
         )
 
-        # Check code matches (case-insensitive, exact or partial)
-        code_match = any(
-            code.upper() in query_upper
-            for code in codes
-        )
-
-        # Boost score if match found
-        if synonym_match or code_match:
-            old_score = result.score
-            result.score = min(1.0, result.score + boost_factor)
-            logger.debug(
-                f"Boosted {article_id}: {old_score:.3f} → {result.score:.3f} "
-                f"(synonym={synonym_match}, code={code_match})"
-            )
-
-    # Re-sort by score (descending)
-    results.sort(key=lambda x: x.score, reverse=True)
-    return results
+    # Re-sort by score (descending, stable for ties)
+    order = np.argsort(-boosted, kind="stable").tolist()
+    new_scores = boosted.tolist()
+    for i, result in enumerate(results):
+        result.score = new_scores[i]
+    results[:] = [results[i] for i in order]
+    return results, max(best_score, new_scores[order[0]])
 
 
 def summarize_with_llm(query: str, context: str, sources: List[Dict[str, str]]) -> str:
@@ -279,7 +591,7 @@ def summarize_with_llm(query: str, context: str, sources: List[Dict[str, str]])
         raise RuntimeError(f"LLM completion error: {exc}") from exc
 
 
-def perform_web_search(query: str, num_results: int = 5) -> List[Dict[str, str]]:
+async def perform_web_search(query: str, num_results: int = 5) -> List[Dict[str, str]]:
     if SERPER_API_KEY:
         url = "https://google.serper.dev/search"
         headers = {
@@ -287,7 +599,7 @@ def perform_web_search(query: str, num_results: int = 5) -> List[Dict[str, str]]
             "Content-Type": "application/json",
         }
         payload = {"q": query, "num": num_results}
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        response = await _http.post(url, headers=headers, json=payload)
         if response.status_code >= 400:
             raise RuntimeError(
                 f"Serper search error {response.status_code}: {response.text}"
@@ -306,7 +618,7 @@ def perform_web_search(query: str, num_results: int = 5) -> List[Dict[str, str]]
         return results
 
     # Fallback to DuckDuckGo Instant Answer API (no key required)
-    response = requests.get(
+    response = await _http.get(
         "https://api.duckduckgo.com/",
         params={
             "q": query,
@@ -361,20 +673,24 @@ def synthesize_web_answer(query: str, results: List[Dict[str, str]]) -> str:
     return summarize_with_llm(query, context, results)
 
 
+# Optional chunk metadata copied into each source: (metadata key, source key, cast)
+_META_FIELDS = (
+    ("heading_hierarchy", "heading_path", str),
+    ("heading_level", "level", int),
+    ("section_title", "section", str),
+    ("parent_title", "parent", str),
+    ("token_count", "tokens", int),
+)
+
+
 def build_context_block(results: List[RetrievalResult]) -> Tuple[str, List[Dict[str, str]]]:
     context_lines = []
     sources: List[Dict[str, str]] = []
     for item in results:
-        title = item.metadata.get("title") or item.metadata.get("source_title") or ""
-        src_kind = item.metadata.get("source_kind", "")
-        src_file = item.metadata.get("source_file", "")
-
-        # Extract semantic chunking metadata
-        heading_hierarchy = item.metadata.get("heading_hierarchy", "")
-        heading_level = item.metadata.get("heading_level")
-        section_title = item.metadata.get("section_title", "")
-        parent_title = item.metadata.get("parent_title", "")
-        token_count = item.metadata.get("token_count")
+        meta = item.metadata
+        title = meta.get("title") or meta.get("source_title") or ""
+        src_kind = meta.get("source_kind", "")
+        src_file = meta.get("source_file", "")
 
         # Build enhanced source info
         source_info = {
@@ -386,35 +702,23 @@ def build_context_block(results: List[RetrievalResult]) -> Tuple[str, List[Dict[
         }
 
         # Add hierarchy information if available
-        if heading_hierarchy:
-            source_info["heading_path"] = heading_hierarchy
-        if heading_level:
-            source_info["level"] = int(heading_level) if isinstance(heading_level, str) else heading_level
-        if section_title:
-            source_info["section"] = section_title
-        if parent_title:
-            source_info["parent"] = parent_title
-        if token_count:
-            source_info["tokens"] = int(token_count) if isinstance(token_count, str) else token_count
+        for src, dst, cast in _META_FIELDS:
+            value = meta.get(src)
+            if value:
+                source_info[dst] = cast(value)
 
         sources.append(source_info)
 
         # Build context with hierarchy path
-        context_parts = []
-        if heading_hierarchy:
-            context_parts.append(f"📍 Path: {heading_hierarchy}")
-        else:
-            context_parts.append(f"Title: {title or 'Untitled'}")
-
-        context_parts.append(f"Score: {item.score:.3f}")
-        context_parts.append(f"Source: {src_kind} {src_file}")
-
-        if parent_title:
-            context_parts.append(f"Parent Section: {parent_title}")
-
-        context_parts.append(f"Content:\n{item.text}")
-
-        context_lines.append("\n".join(context_parts))
+        heading_hierarchy = source_info.get("heading_path")
+        parent_title = source_info.get("parent")
+        context_lines.append("\n".join((
+            f"📍 Path: {heading_hierarchy}" if heading_hierarchy else f"Title: {title or 'Untitled'}",
+            f"Score: {item.score:.3f}",
+            f"Source: {src_kind} {src_file}",
+            *((f"Parent Section: {parent_title}",) if parent_title else ()),
+            f"Content:\n{item.text}",
+        )))
 
     return "\n\n---\n\n".join(context_lines), sources
 
@@ -531,13 +835,16 @@ def read_query() -> FileResponse:
     return FileResponse(index_file)
 
 
+_HEALTH_BODY = orjson.dumps({"status": "ok"})
+
+
 @app.get("/health")
-def health_check() -> Dict[str, str]:
-    return {"status": "ok"}
+def health_check() -> Response:
+    return Response(_HEALTH_BODY, media_type="application/json")
 
 
 @app.get("/api/documents")
-def list_documents() -> JSONResponse:
+def list_documents() -> ORJSONResponse:
     """List all available markdown documents in the md/ directory."""
     if not MD_DIR.exists():
         raise HTTPException(status_code=404, detail="MD directory not found.")
@@ -550,7 +857,7 @@ def list_documents() -> JSONResponse:
 
         # Check for associated images directory
         images_dir = MD_DIR / f"{md_file.stem}_images"
-        has_images = images_dir.exists() and images_dir.is_dir()
+        has_images = images_dir.is_dir()
 
         documents.append({
             "id": md_file.stem,
@@ -559,121 +866,166 @@ def list_documents() -> JSONResponse:
             "has_images": has_images,
         })
 
-    return JSONResponse({"documents": documents})
+    return ORJSONResponse({"documents": documents})
+
+
+# Rendered document responses keyed by doc_id -> (st_mtime_ns, JSON body)
+_doc_cache: Dict[str, Tuple[int, bytes]] = {}
 
 
 @app.get("/api/documents/{doc_id}")
-def get_document(doc_id: str) -> JSONResponse:
+async def get_document(doc_id: str, request: Request) -> Response:
     """Get a specific document's content and generate TOC."""
-    if not MD_DIR.exists():
-        raise HTTPException(status_code=404, detail="MD directory not found.")
-
     # Sanitize doc_id to prevent path traversal
     doc_id = doc_id.replace("..", "").replace("/", "").replace("\\", "")
 
     md_file = MD_DIR / f"{doc_id}.md"
-    if not md_file.exists():
+    try:
+        stat = md_file.stat()
+    except FileNotFoundError:
+        if not MD_DIR.exists():
+            raise HTTPException(status_code=404, detail="MD directory not found.")
         raise HTTPException(status_code=404, detail=f"Document '{doc_id}' not found.")
+    mtime = stat.st_mtime_ns
+    headers = {
+        "ETag": f'"{mtime:x}-{stat.st_size:x}"',
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    cached = _doc_cache.get(doc_id)
+    if cached and cached[0] == mtime:
+        return Response(cached[1], media_type="application/json", headers=headers)
 
     try:
-        content = md_file.read_text(encoding="utf-8")
+        payload = await asyncio.to_thread(load_document, md_file, doc_id)
+    except Exception as exc:
+        logger.error(f"Error reading document {doc_id}: {exc}")
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
 
-        # Parse TOC from headings
-        toc = parse_markdown_toc(content)
+    # Serialize once; repeat views send the cached bytes as-is
+    body = orjson.dumps(payload)
+    _doc_cache[doc_id] = (mtime, body)
+    return Response(body, media_type="application/json", headers=headers)
 
-        # Clean up content: remove METADATA comments
-        content = clean_markdown_content(content)
 
-        # Fix image paths to use /md/ prefix
-        content = fix_image_paths(content, doc_id)
+def load_document(md_file: Path, doc_id: str) -> Dict[str, object]:
+    """Read a markdown document and build the viewer payload (content + TOC).
+
+    The file is memory-mapped and scanned with bytes patterns, so the only
+    str built is the final content.
+    """
+    with md_file.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            toc, content = [], b""
+        else:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Parse TOC from headings
+                toc = parse_markdown_toc(mm)
+
+                # Clean up content: remove METADATA comments
+                content = clean_markdown_content(mm)
+
+    # Fix image paths to use /md/ prefix
+    content = fix_image_paths(content, doc_id)
+
+    text = content.decode("utf-8")
+    if "\r" in text:
+        # Match text-mode reads (universal newlines)
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    return {
+        "id": doc_id,
+        "name": md_file.name,
+        "content": text,
+        "toc": toc,
+    }
 
-        return JSONResponse({
-            "id": doc_id,
-            "name": md_file.name,
-            "content": content,
-            "toc": toc,
-        })
-    except Exception as exc:
-        logger.error(f"Error reading document {doc_id}: {exc}")
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
 
+_HEADING_RE = re.compile(rb"^(#{1,6})[ \t]+(.+)$", re.MULTILINE)
+_HEADING_ID_STRIP_RE = re.compile(r"[^\w\s-]")
+_METADATA_COMMENT_RE = re.compile(rb"<!--METADATA.*?-->", re.DOTALL)
+_IMAGE_RE = re.compile(rb"!\[([^\]]*)\]\(([^)]+)\)")
 
-def parse_markdown_toc(content: str) -> List[Dict[str, object]]:
+
+def parse_markdown_toc(content: bytes) -> List[Dict[str, object]]:
     """Parse markdown content and extract heading hierarchy for TOC.
 
+    Accepts UTF-8 bytes (or an mmap) and decodes only the heading titles.
     Returns a flat list of headings with level and id information.
     """
-    import re
-
     toc = []
-    lines = content.split("\n")
     heading_counts: Dict[str, int] = {}
 
-    for line in lines:
-        # Match markdown headings (# to ######)
-        match = re.match(r"^(#{1,6})\s+(.+)$", line)
-        if match:
-            level = len(match.group(1))
-            title = match.group(2).strip()
-
-            # Remove emoji and special characters for ID
-            clean_title = re.sub(r"[^\w\s-]", "", title)
-            heading_id = clean_title.lower().replace(" ", "-")
-
-            # Handle duplicate IDs
-            if heading_id in heading_counts:
-                heading_counts[heading_id] += 1
-                heading_id = f"{heading_id}-{heading_counts[heading_id]}"
-            else:
-                heading_counts[heading_id] = 0
-
-            toc.append({
-                "level": level,
-                "title": title,
-                "id": heading_id,
-            })
+    # Match markdown headings (# to ######) in a single scan over the document
+    for match in _HEADING_RE.finditer(content):
+        level = len(match.group(1))
+        title = match.group(2).decode("utf-8").strip()
+
+        # Remove emoji and special characters for ID
+        clean_title = _HEADING_ID_STRIP_RE.sub("", title)
+        heading_id = clean_title.lower().replace(" ", "-")
+
+        # Handle duplicate IDs
+        if heading_id in heading_counts:
+            heading_counts[heading_id] += 1
+            heading_id = f"{heading_id}-{heading_counts[heading_id]}"
+        else:
+            heading_counts[heading_id] = 0
+
+        toc.append({
+            "level": level,
+            "title": title,
+            "id": heading_id,
+        })
 
     return toc
 
 
-def clean_markdown_content(content: str) -> str:
+def clean_markdown_content(content: bytes) -> bytes:
     """Remove METADATA HTML comments from markdown content."""
-    import re
-
     # Remove HTML comments that contain METADATA
-    content = re.sub(r"<!--METADATA.*?-->", "", content, flags=re.DOTALL)
+    content = _METADATA_COMMENT_RE.sub(b"", content)
 
     # Remove any other HTML comments (optional)
-    # content = re.sub(r"<!--.*?-->", "", content, flags=re.DOTALL)
+    # content = re.sub(rb"<!--.*?-->", b"", content, flags=re.DOTALL)
 
     return content
 
 
-def fix_image_paths(content: str, doc_id: str) -> str:
-    """Fix image paths in markdown to use /md/ prefix."""
-    import re
+@functools.lru_cache(maxsize=128)
+def _get_image_fixer(doc_id: str) -> Callable[["re.Match[bytes]"], bytes]:
+    """Build the image-path replacement callback for one document, with its prefixes baked in."""
+    prefix = f"{doc_id}_images/".encode("utf-8")
+    out_prefix = b"/md/" + prefix
 
     # Replace image paths like ![alt](image.png) with ![alt](/md/DocName_images/image.png)
-    def replace_image(match):
-        alt = match.group(1)
+    def replace_image(match: "re.Match[bytes]") -> bytes:
         path = match.group(2)
 
         # Skip if already absolute or HTTP URL
-        if path.startswith("http") or path.startswith("/"):
+        if path.startswith((b"http", b"/")):
             return match.group(0)
 
         # If path already contains the images directory, just add /md/ prefix
-        if path.startswith(f"{doc_id}_images/"):
-            return f"![{alt}](/md/{path})"
+        if path.startswith(prefix):
+            return b"![" + match.group(1) + b"](/md/" + path + b")"
 
         # Otherwise, assume images are in {doc_id}_images/ directory
-        return f"![{alt}](/md/{doc_id}_images/{path})"
+        return b"![" + match.group(1) + b"](" + out_prefix + path + b")"
+
+    return replace_image
 
-    return re.sub(r"!\[([^\]]*)\]\(([^)]+)\)", replace_image, content)
+
+def fix_image_paths(content: bytes, doc_id: str) -> bytes:
+    """Fix image paths in markdown to use /md/ prefix."""
+    return _IMAGE_RE.sub(_get_image_fixer(doc_id), content)
 
 
 @app.post("/api/classify")
-def handle_classify(payload: QueryPayload) -> JSONResponse:
+async def handle_classify(payload: QueryPayload) -> ORJSONResponse:
     """Classify a query by intent and category (Phase 2 feature)."""
     if not query_classifier:
         raise HTTPException(
@@ -682,8 +1034,8 @@ def handle_classify(payload: QueryPayload) -> JSONResponse:
         )
 
     try:
-        classification = query_classifier.classify(payload.query)
-        return JSONResponse({
+        classification = await classify_query(payload.query)
+        return ORJSONResponse({
             "query": payload.query,
             "classification": classification
         })
@@ -693,7 +1045,7 @@ def handle_classify(payload: QueryPayload) -> JSONResponse:
 
 
 @app.post("/api/query")
-def handle_query(payload: QueryPayload) -> JSONResponse:
+async def handle_query(payload: QueryPayload) -> Response:
     logger.info(f"Received query: '{payload.query[:100]}...' (top_k={payload.top_k})")
     threshold = (
         payload.threshold
@@ -702,12 +1054,13 @@ def handle_query(payload: QueryPayload) -> JSONResponse:
     )
     logger.debug(f"Using similarity threshold: {threshold}")
     steps: List[Dict[str, object]] = []
+    classification: Optional[Dict] = None
 
     # Phase 2: Use catalog retriever if available
     if catalog_retriever and query_classifier:
         try:
             # Step 1: Classify query
-            classification = query_classifier.classify(payload.query)
+            classification = await classify_query(payload.query)
             logger.info(f"Classification: intent={classification['intent']}, "
                        f"category={classification['category']}, "
                        f"confidence={classification['confidence']:.2f}")
@@ -721,7 +1074,8 @@ def handle_query(payload: QueryPayload) -> JSONResponse:
             })
 
             # Step 2: Retrieve articles with metadata filtering
-            article_results = catalog_retriever.retrieve(
+            article_results = await asyncio.to_thread(
+                catalog_retriever.retrieve,
                 payload.query,
                 classification=classification,
                 top_k=payload.top_k
@@ -763,7 +1117,7 @@ def handle_query(payload: QueryPayload) -> JSONResponse:
             # Step 4: Build context and sources from relevant articles
             if relevant_results:
                 context_block, sources = build_catalog_context(relevant_results)
-                best_score = max([r["score"] for r in relevant_results]) if relevant_results else 0.0
+                best_score = max((r["score"] for r in relevant_results), default=0.0)
 
                 steps.append({
                     "stage": "vector_search",
@@ -776,14 +1130,31 @@ def handle_query(payload: QueryPayload) -> JSONResponse:
 
                 # Step 5: Generate answer
                 try:
-                    answer = summarize_with_llm(payload.query, context_block, sources)
+                    if payload.stream:
+                        answer_chunks = await start_answer_stream(
+                            payload.query, context_block, sources
+                        )
+                        return stream_query_response(
+                            {
+                                "query": payload.query,
+                                "mode": "catalog_rag",
+                                "sources": sources,
+                                "classification": classification,
+                                "steps": steps,
+                            },
+                            answer_chunks,
+                        )
+
+                    answer = await asyncio.to_thread(
+                        summarize_with_llm, payload.query, context_block, sources
+                    )
                     steps.append({
                         "stage": "rag_generation",
                         "status": "success",
                         "detail": "Generated answer using catalog articles"
                     })
 
-                    return JSONResponse({
+                    return ORJSONResponse({
                         "query": payload.query,
                         "answer": answer,
                         "mode": "catalog_rag",
@@ -808,22 +1179,27 @@ def handle_query(payload: QueryPayload) -> JSONResponse:
             })
 
     # Phase 1: Chunk-based retrieval (fallback or when catalog not available)
+    # Push a confident category classification down to Chroma as a prefilter
+    where = None
+    if (
+        classification
+        and classification.get("confidence", 0.0) > 0.5
+        and classification.get("category") in ("application", "data")
+    ):
+        where = {"category": classification["category"]}
+
     try:
-        retrieved, best_score = query_vector_store(
-            payload.query, payload.top_k, threshold
+        retrieved, best_score = await query_vector_store(
+            payload.query, payload.top_k, threshold, where
         )
         logger.info(f"Vector search: retrieved {len(retrieved)} chunks, best_score={best_score:.4f}")
 
         # Boost scores based on synonym and code matches
         if catalog_builder and retrieved:
             try:
-                catalog_data = catalog_builder.catalog
-                retrieved = boost_scores_by_synonyms_and_codes(
-                    payload.query, retrieved, catalog_data
+                retrieved, best_score = boost_scores_by_synonyms_and_codes(
+                    payload.query, retrieved, catalog_builder.term_matcher, best_score
                 )
-                # Recalculate best_score after boosting
-                if retrieved:
-                    best_score = max(r.score for r in retrieved)
                 logger.info(f"After synonym/code boost: best_score={best_score:.4f}")
             except Exception as boost_exc:
                 logger.warning(f"Synonym/code boosting failed: {boost_exc}")
@@ -863,7 +1239,13 @@ def handle_query(payload: QueryPayload) -> JSONResponse:
     if retrieved:
         context_block, sources = build_context_block(retrieved)
         try:
-            answer = summarize_with_llm(payload.query, context_block, sources)
+            if payload.stream and best_score >= threshold:
+                answer_chunks = await start_answer_stream(payload.query, context_block, sources)
+                response_payload.update({"mode": "rag", "sources": sources})
+                return stream_query_response(response_payload, answer_chunks)
+            answer = await asyncio.to_thread(
+                summarize_with_llm, payload.query, context_block, sources
+            )
             response_payload.update(
                 {
                     "answer": answer,
@@ -893,7 +1275,7 @@ def handle_query(payload: QueryPayload) -> JSONResponse:
     if use_fallback:
         logger.info("Using web search fallback")
         try:
-            results = perform_web_search(payload.query)
+            results = await perform_web_search(payload.query)
             logger.info(f"Web search returned {len(results)} results")
             steps.append(
                 {
@@ -902,17 +1284,13 @@ def handle_query(payload: QueryPayload) -> JSONResponse:
                     "detail": f"Retrieved {len(results)} web results.",
                 }
             )
-            web_answer = synthesize_web_answer(payload.query, results)
+            web_answer = await asyncio.to_thread(synthesize_web_answer, payload.query, results)
+            parts = [response_payload["answer"], web_answer]
             response_payload.update(
                 {
                     "fallback_results": results,
                     "mode": "web" if not response_payload["answer"] else "hybrid",
-                    "answer": (
-                        response_payload["answer"] + "\n\n"
-                        if response_payload["answer"]
-                        else ""
-                    )
-                    + web_answer,
+                    "answer": "\n\n".join(part for part in parts if part),
                 }
             )
         except Exception as exc:
@@ -929,7 +1307,83 @@ def handle_query(payload: QueryPayload) -> JSONResponse:
                     "base or the web. Please try a different query."
                 )
                 response_payload["mode"] = "none"
-    return JSONResponse(response_payload)
+    if payload.stream:
+        return stream_query_response(response_payload)
+    return ORJSONResponse(response_payload)
+
+
+def sse_event(data: Dict[str, object], event: Optional[str] = None) -> bytes:
+    """Encode one server-sent event (unnamed events are answer deltas)."""
+    head = f"event: {event}\n".encode("utf-8") if event else b""
+    return head + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+async def start_answer_stream(
+    query: str, context_block: str, sources: List[Dict[str, str]]
+) -> Iterator[str]:
+    """Start streaming an answer, raising here if the LLM fails before the first chunk.
+
+    Pulling the first chunk up front lets callers take the same fallback as the
+    non-streaming path instead of surfacing the failure as an SSE ``error`` event.
+    """
+    chunks = generate_answer_stream(query, context_block, sources)
+    first = await asyncio.to_thread(next, chunks, None)
+    if first is None:
+        return iter(())
+    return itertools.chain((first,), chunks)
+
+
+def stream_query_response(
+    payload: Dict[str, object],
+    answer_chunks: Optional[Iterator[str]] = None,
+) -> StreamingResponse:
+    """Send a query response as server-sent events.
+
+    Events: ``meta`` (the response without the answer, so sources render
+    immediately), unnamed ``{"delta": ...}`` answer chunks, then ``done`` with
+    any trailing steps, or ``error`` if generation fails mid-stream.
+
+    With ``answer_chunks`` the answer is generated while streaming; otherwise
+    ``payload["answer"]`` is sent as a single delta.
+    """
+
+    # Sync generator: Starlette iterates it in the thread pool, so blocking LLM reads are fine
+    def events() -> Iterator[bytes]:
+        yield sse_event({key: value for key, value in payload.items() if key != "answer"}, "meta")
+
+        if answer_chunks is None:
+            if payload.get("answer"):
+                yield sse_event({"delta": payload["answer"]})
+            yield sse_event({"steps": []}, "done")
+            return
+
+        try:
+            for chunk in answer_chunks:
+                yield sse_event({"delta": chunk})
+        except Exception as exc:
+            # Any failure must still end the stream, or the client keeps waiting
+            logger.error(f"Failed to stream answer: {exc}")
+            yield sse_event({"detail": f"LLM completion error: {exc}"}, "error")
+            return
+
+        yield sse_event(
+            {
+                "steps": [
+                    {
+                        "stage": "rag_generation",
+                        "status": "success",
+                        "detail": "Streamed answer using retrieved context.",
+                    }
+                ]
+            },
+            "done",
+        )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 def run_server(host: str = "0.0.0.0", port: int = DEFAULT_PORT, reload: bool = False) -> None:
@@ -940,12 +1394,28 @@ def run_server(host: str = "0.0.0.0", port: int = DEFAULT_PORT, reload: bool = F
             "Missing dependency 'uvicorn'. Install it with 'pip install uvicorn[standard]' and retry."
         ) from exc
 
+    # uvloop (POSIX only) and httptools come with uvicorn[standard]; fall back to the pure-Python stack
+    loop = "asyncio"
+    if sys.platform != "win32":
+        try:
+            import uvloop  # noqa: F401
+            loop = "uvloop"
+        except ImportError:
+            pass
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+
     uvicorn.run(
         "app:app",
         host=host,
         port=port,
         reload=reload,
         log_level="info",
+        loop=loop,
+        http=http,
     )
 
 
@@ -46,7 +46,7 @@ form.addEventListener("submit", async (event) => {
       headers: {
         "Content-Type": "application/json",
       },
-      body: JSON.stringify(payload),
+      body: JSON.stringify({ ...payload, stream: true }),
     });
 
     if (!response.ok) {
@@ -54,8 +54,21 @@ form.addEventListener("submit", async (event) => {
       throw new Error(message?.detail || `Request failed (${response.status})`);
     }
 
-    const data = await response.json();
-    renderResult(data);
+    let result = null;
+    await readEventStream(response, (name, data) => {
+      if (name === "meta") {
+        // Sources and trace arrive before the answer
+        result = { ...data, answer: "" };
+        renderResult(result);
+      } else if (name === "message") {
+        result.answer += data.delta;
+        renderAnswer(result);
+      } else if (name === "done") {
+        (data.steps || []).forEach((step) => console.log(`✅ ${prettifyStage(step.stage)}: ${step.detail}`));
+      } else if (name === "error") {
+        throw new Error(data.detail || "Answer generation failed.");
+      }
+    });
     setStatus("Agent run complete.", "success");
   } catch (error) {
     console.error(error);
@@ -87,7 +100,7 @@ function clearOutputs() {
   sourcesList.innerHTML = "";
 }
 
-function renderResult(data) {
+function renderAnswer(data) {
   if (data.answer) {
     answerBlock.hidden = false;
     // Render answer as markdown
@@ -95,6 +108,10 @@ function renderResult(data) {
     const label = MODE_LABELS[data.mode] || "Result";
     modeLabel.textContent = label;
   }
+}
+
+function renderResult(data) {
+  renderAnswer(data);
 
   // Log steps to console instead of displaying in UI
   if (Array.isArray(data.steps) && data.steps.length) {
@@ -225,3 +242,34 @@ async function safeJson(response) {
     return null;
   }
 }
+
+// Read a server-sent event stream, calling onEvent(name, data) per event
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let name = "message";
+      const dataLines = [];
+      raw.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) {
+          name = line.slice(6).trim();
+        } else if (line.startsWith("data:")) {
+          dataLines.push(line.slice(5).trimStart());
+        }
+      });
+      if (dataLines.length) {
+        onEvent(name, JSON.parse(dataLines.join("\n")));
+      }
+    }
+  }
+}
@@ -330,7 +330,7 @@ function setupQueryForm() {
         headers: {
           "Content-Type": "application/json",
         },
-        body: JSON.stringify(payload),
+        body: JSON.stringify({ ...payload, stream: true }),
       });
 
       if (!response.ok) {
@@ -338,8 +338,21 @@ function setupQueryForm() {
         throw new Error(message?.detail || `Request failed (${response.status})`);
       }
 
-      const data = await response.json();
-      renderQueryResult(data);
+      let result = null;
+      await readEventStream(response, (name, data) => {
+        if (name === "meta") {
+          // Sources and trace arrive before the answer
+          result = { ...data, answer: "" };
+          renderQueryResult(result);
+        } else if (name === "message") {
+          result.answer += data.delta;
+          renderQueryAnswer(result);
+        } else if (name === "done") {
+          (data.steps || []).forEach((step) => console.log(`✅ ${prettifyStage(step.stage)}: ${step.detail}`));
+        } else if (name === "error") {
+          throw new Error(data.detail || "Answer generation failed.");
+        }
+      });
       setQueryStatus("Query complete.", "success");
     } catch (error) {
       console.error(error);
@@ -372,13 +385,17 @@ function clearQueryOutputs() {
   sourcesList.innerHTML = "";
 }
 
-function renderQueryResult(data) {
+function renderQueryAnswer(data) {
   if (data.answer) {
     answerBlock.hidden = false;
     answerText.innerHTML = marked.parse(data.answer);
     const label = MODE_LABELS[data.mode] || "Result";
     modeLabel.textContent = label;
   }
+}
+
+function renderQueryResult(data) {
+  renderQueryAnswer(data);
 
   // Log steps to console
   if (Array.isArray(data.steps) && data.steps.length) {
@@ -510,6 +527,37 @@ function escapeRegExp(string) {
   return string.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
 }
 
+// Read a server-sent event stream, calling onEvent(name, data) per event
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let name = "message";
+      const dataLines = [];
+      raw.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) {
+          name = line.slice(6).trim();
+        } else if (line.startsWith("data:")) {
+          dataLines.push(line.slice(5).trimStart());
+        }
+      });
+      if (dataLines.length) {
+        onEvent(name, JSON.parse(dataLines.join("\n")));
+      }
+    }
+  }
+}
+
 // Initialize on page load
 if (document.readyState === "loading") {
   document.addEventListener("DOMContentLoaded", init);
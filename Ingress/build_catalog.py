@@ -16,6 +16,8 @@ Usage:
 """
 
 import argparse
+import mmap
+import os
 import sys
 from pathlib import Path
 
@@ -114,11 +116,15 @@ Examples:
         print(f"\nProcessing: {md_file.name}")
 
         try:
-            # Build catalog from file
-            stats = builder.build_from_markdown(
-                md_file,
-                clean_existing=(args.reset and files_processed == 0)
-            )
+            # Build catalog from a memory-mapped view of the file
+            clean_existing = args.reset and files_processed == 0
+            with md_file.open("rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    # mmap cannot map an empty file
+                    stats = builder.build_from_bytes(md_file, b"", clean_existing=clean_existing)
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        stats = builder.build_from_bytes(md_file, mm, clean_existing=clean_existing)
 
             if stats['articles_count'] == 0:
                 print(f"  ⚠ No articles with metadata found")
@@ -2,9 +2,13 @@
 # Converts .docx files in the 'docx' directory to markdown files in the 'md' directory,
 # extracting images and saving them in corresponding image directories.
 #
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+import hashlib
+import os
 import re
 import shutil
+from typing import Iterator, Optional
 
 try:
     from docx import Document
@@ -25,6 +29,13 @@ MD_DIR = BASE_DIR / "md"
 MD_DIR.mkdir(parents=True, exist_ok=True)
 
 WHITESPACE_RE = re.compile(r"\s+")
+BLIP_TAG = qn("a:blip")
+EMBED_ATTR = qn("r:embed")
+DOCPR_TAG = qn("wp:docPr")
+# Splits text into (leading whitespace, core, trailing whitespace)
+_WS_SPLIT = re.compile(r"(\s*)(.*?)(\s*)\Z", re.DOTALL)
+_DIGITS_RE = re.compile(r"\d+")
+IMAGE_WRITERS = 4  # Threads writing extracted images while the XML is parsed
 
 
 def iter_block_items(parent):
@@ -37,43 +48,50 @@ def iter_block_items(parent):
             yield Table(child, parent)
 
 
-def clean_text(text: str) -> str:
+def _normalize(text: str) -> str:
+    """Collapse whitespace runs to single spaces and strip the ends."""
     return WHITESPACE_RE.sub(" ", text).strip()
 
 
-def sanitize_alt(text: str) -> str:
-    return WHITESPACE_RE.sub(" ", text or "").strip()
-
-
 def normalize_run_text(text: str) -> str:
     return text.replace("\xa0", " ").replace("\r", "").replace("\n", " ")
 
 
 def extract_images_from_run(run, ctx) -> list[str]:
     outputs: list[str] = []
-    blips = run.element.xpath(".//*[local-name()='blip']")
+    blips = list(run.element.iter(BLIP_TAG))
+    if not blips:
+        return outputs
+    doc_pr = next(run.element.iter(DOCPR_TAG), None)
     for blip in blips:
-        r_id = blip.get(qn("r:embed"))
+        r_id = blip.get(EMBED_ATTR)
         if not r_id:
             continue
         if r_id in ctx["image_map"]:
             rel_path = ctx["image_map"][r_id]
         else:
             image_part = run.part.related_parts[r_id]
-            ext = image_part.partname.ext or image_part.content_type.split("/")[-1]
-            filename = f"{ctx['doc_stem']}_img_{ctx['image_index']}.{ext}"
-            ctx["image_index"] += 1
-            target_path = ctx["image_dir"] / filename
-            target_path.write_bytes(image_part.blob)
-            rel_path = (ctx["image_rel_dir"] / filename).as_posix()
+            blob = image_part.blob
+            # Same picture pasted under another relationship id: reuse its file
+            digest = hashlib.blake2b(blob, digest_size=16).digest()
+            rel_path = ctx["blob_map"].get(digest)
+            if rel_path is None:
+                ext = image_part.partname.ext or image_part.content_type.split("/")[-1]
+                filename = f"{ctx['doc_stem']}_img_{ctx['image_index']}.{ext}"
+                ctx["image_index"] += 1
+                target_path = ctx["image_dir"] / filename
+                ctx["pending_writes"].append(
+                    ctx["writer_pool"].submit(target_path.write_bytes, blob)
+                )
+                rel_path = (ctx["image_rel_dir"] / filename).as_posix()
+                ctx["blob_map"][digest] = rel_path
             ctx["image_map"][r_id] = rel_path
-        doc_pr = run.element.xpath(".//*[local-name()='docPr']")
         alt = ""
-        if doc_pr:
-            raw_alt = doc_pr[0].get("descr") or doc_pr[0].get("title") or ""
-            alt = sanitize_alt(raw_alt)
+        if doc_pr is not None:
+            raw_alt = doc_pr.get("descr") or doc_pr.get("title") or ""
+            alt = _normalize(raw_alt)
         if not alt:
-            alt = sanitize_alt(Path(rel_path).stem.replace("_", " ").title())
+            alt = _normalize(Path(rel_path).stem.replace("_", " ").title())
         outputs.append(f"![{alt}]({rel_path})")
     return outputs
 
@@ -82,15 +100,9 @@ def format_run_text(run) -> str:
     text = normalize_run_text(run.text)
     if not text:
         return ""
-    prefix_len = len(text) - len(text.lstrip())
-    suffix_len = len(text) - len(text.rstrip())
-    core_start = prefix_len
-    core_end = len(text) - suffix_len if suffix_len else len(text)
-    prefix = text[:core_start]
-    suffix = text[core_end:] if suffix_len else ""
-    core = text[core_start:core_end]
+    prefix, core, suffix = _WS_SPLIT.match(text).groups()
     if not core:
-        return prefix + suffix
+        return text
 
     formatted = core
     if run.bold and run.italic:
@@ -103,14 +115,26 @@ def format_run_text(run) -> str:
 
 
 def render_runs(paragraph: Paragraph, ctx) -> list[tuple[str, str]]:
+    """Render runs into alternating text/image tokens.
+
+    Consecutive text runs are collected and joined once, so text tokens are
+    never adjacent.
+    """
     tokens: list[tuple[str, str]] = []
+    segments: list[str] = []
     for run in paragraph.runs:
         images = extract_images_from_run(run, ctx)
-        for image in images:
-            tokens.append(("image", image))
+        if images:
+            if segments:
+                tokens.append(("text", "".join(segments)))
+                segments = []
+            for image in images:
+                tokens.append(("image", image))
         formatted_text = format_run_text(run)
         if formatted_text:
-            tokens.append(("text", formatted_text))
+            segments.append(formatted_text)
+    if segments:
+        tokens.append(("text", "".join(segments)))
     if not tokens:
         fallback = normalize_run_text(paragraph.text)
         if fallback.strip():
@@ -124,88 +148,75 @@ def paragraph_is_list(paragraph: Paragraph) -> bool:
     return bool(p_pr is not None and p_pr.numPr is not None)
 
 
-def normalize_line(text: str) -> str:
-    return WHITESPACE_RE.sub(" ", text).strip()
-
-
-def paragraph_to_markdown(paragraph: Paragraph, ctx) -> list[str]:
+def paragraph_to_markdown(paragraph: Paragraph, ctx) -> Iterator[str]:
     tokens = render_runs(paragraph, ctx)
     if not tokens:
-        return []
+        return
 
+    # Resolve style/list lookups once per paragraph rather than per token
     style_name = (paragraph.style.name or "").lower()
-    lines: list[str] = []
-    text_buffer = ""
+    is_list = paragraph_is_list(paragraph)
+    heading_level = 0
+    if style_name.startswith("heading"):
+        level_match = _DIGITS_RE.search(style_name)
+        level = int(level_match.group()) if level_match else 1
+        heading_level = max(1, min(level, 6))
     emitted_primary = False
 
-    def flush_text(buffer: str, primary: bool) -> None:
-        nonlocal lines, emitted_primary
-        normalized = normalize_line(buffer)
+    def flush_text(
+        buffer: str, primary: bool, heading_level=heading_level, is_list=is_list
+    ) -> Optional[str]:
+        nonlocal emitted_primary
+        normalized = _normalize(buffer)
         if not normalized:
-            return
-        if primary:
-            if style_name.startswith("heading"):
-                level_match = re.findall(r"\d+", style_name)
-                level = int(level_match[0]) if level_match else 1
-                level = max(1, min(level, 6))
-                lines.append(f"{'#' * level} {normalized}")
-            elif paragraph_is_list(paragraph):
-                lines.append(f"- {normalized}")
-            else:
-                lines.append(normalized)
-        else:
-            if paragraph_is_list(paragraph):
-                lines.append(f"  {normalized}")
-            else:
-                lines.append(normalized)
+            return None
         emitted_primary = emitted_primary or primary
+        if primary:
+            if heading_level:
+                return f"{'#' * heading_level} {normalized}"
+            if is_list:
+                return f"- {normalized}"
+            return normalized
+        if is_list:
+            return f"  {normalized}"
+        return normalized
 
     for kind, value in tokens:
         if kind == "text":
-            text_buffer += value
+            line = flush_text(value, primary=not emitted_primary)
+            if line is not None:
+                yield line
         else:  # image
-            if text_buffer:
-                flush_text(text_buffer, primary=not emitted_primary)
-                text_buffer = ""
-            lines.append(value)
+            yield value
             emitted_primary = True
 
-    if text_buffer:
-        flush_text(text_buffer, primary=not emitted_primary)
-
-    return lines
 
+def table_to_markdown(table: Table) -> Iterator[str]:
+    raw_rows = [[cell.text for cell in row.cells] for row in table.rows]
 
-def table_to_markdown(table: Table) -> list[str]:
-    rows = []
-    for row in table.rows:
-        cells = [clean_text(cell.text) for cell in row.cells]
-        rows.append(cells)
+    # Bail out on empty tables before normalizing every cell
+    if not any(text.strip() for row in raw_rows for text in row):
+        return
 
-    if not rows or all(not any(cell for cell in row) for row in rows):
-        return []
+    _n = _normalize
+    rows = [[_n(text) for text in row] for row in raw_rows]
 
     header = rows[0]
     if any(header):
         separator = ["---" if cell else "---" for cell in header]
-        md_lines = [
-            "| " + " | ".join(header) + " |",
-            "| " + " | ".join(separator) + " |",
-        ]
+        yield "| " + " | ".join(header) + " |"
+        yield "| " + " | ".join(separator) + " |"
         body_rows = rows[1:]
     else:
-        md_lines = []
         body_rows = rows
 
     for body in body_rows:
-        md_lines.append("| " + " | ".join(body) + " |")
-
-    return md_lines
+        yield "| " + " | ".join(body) + " |"
 
 
-def convert_docx_to_markdown(docx_path: Path) -> str:
+def convert_docx_to_markdown(docx_path: Path, out_path: Path) -> None:
+    """Convert a .docx file to markdown, streaming lines straight to out_path."""
     doc = Document(docx_path)
-    lines = []
     image_dir = MD_DIR / f"{docx_path.stem}_images"
     shutil.rmtree(image_dir, ignore_errors=True)
     image_dir.mkdir(parents=True, exist_ok=True)
@@ -215,26 +226,53 @@ def convert_docx_to_markdown(docx_path: Path) -> str:
         "image_rel_dir": Path(f"{docx_path.stem}_images"),
         "image_index": 1,
         "image_map": {},
+        "blob_map": {},
+        "pending_writes": [],
     }
     previous_was_list = False
+    last_was_blank = True  # No blank line before the first block
+
+    with ThreadPoolExecutor(max_workers=IMAGE_WRITERS) as writer_pool, \
+            out_path.open("w", encoding="utf-8", buffering=1 << 20) as fp:
+        ctx["writer_pool"] = writer_pool
+        for block in iter_block_items(doc):
+            if isinstance(block, Paragraph):
+                md_lines = paragraph_to_markdown(block, ctx)
+                current_is_list = paragraph_is_list(block)
+            else:
+                md_lines = table_to_markdown(block)
+                current_is_list = False
 
-    for block in iter_block_items(doc):
-        if isinstance(block, Paragraph):
-            md_lines = paragraph_to_markdown(block, ctx)
-            current_is_list = bool(md_lines and paragraph_is_list(block))
-        else:
-            md_lines = table_to_markdown(block)
-            current_is_list = False
+            first = next(md_lines, None)
+            if first is None:
+                continue
 
-        if not md_lines:
-            continue
+            # Blank line between blocks, except between consecutive list items
+            if not last_was_blank and not (previous_was_list and current_is_list):
+                fp.write("\n")
+            line = first
+            fp.write(line)
+            fp.write("\n")
+            for line in md_lines:
+                fp.write(line)
+                fp.write("\n")
+            last_was_blank = line == ""
+            previous_was_list = current_is_list
+
+        if last_was_blank:
+            # Nothing written (block lines are never blank): emit a lone newline
+            fp.write("\n")
 
-        if lines and lines[-1] and not (previous_was_list and current_is_list):
-            lines.append("")
-        lines.extend(md_lines)
-        previous_was_list = current_is_list
+        # Surface any image write errors
+        for future in ctx["pending_writes"]:
+            future.result()
 
-    return "\n".join(lines).rstrip() + "\n"
+
+def _convert_one(docx_file: Path) -> Path:
+    """Convert one .docx file; runs in a worker process."""
+    target = MD_DIR / f"{docx_file.stem}.md"
+    convert_docx_to_markdown(docx_file, target)
+    return target
 
 
 def main():
@@ -247,10 +285,15 @@ def main():
     if not docx_files:
         raise SystemExit(f"No .docx files found in {DOCX_DIR}")
 
-    for docx_file in docx_files:
-        markdown = convert_docx_to_markdown(docx_file)
-        target = MD_DIR / f"{docx_file.stem}.md"
-        target.write_text(markdown, encoding="utf-8")
+    # Each file (and its image directory) is independent, so convert in parallel
+    workers = min(len(docx_files), os.cpu_count() or 1)
+    if workers <= 1:
+        for docx_file in docx_files:
+            _convert_one(docx_file)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(_convert_one, docx_files))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+"""
+Persistent gloss cache for the vectorizers.
+
+Glosses are one LLM call per chunk, so re-running an ingest (e.g. after an
+abort) re-pays that cost for every chunk already seen. GlossCache stores
+them in SQLite keyed by a 16-byte blake2b digest of the chunk text, making
+repeat lookups a local index hit.
+
+Usage:
+    cache = GlossCache(OUTPUT_DIR / "gloss_cache.db")
+    found = cache.get_many(texts)          # {text: gloss} for hits only
+    cache.put_many([(text, gloss), ...])   # one transaction
+    cache.close()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+
+class GlossCache:
+    """SQLite cache of glosses keyed by a hash of the chunk text."""
+
+    _LOOKUP_CHUNK = 500  # Stay under SQLite's bound-parameter limit
+
+    def __init__(self, path: Path):
+        self.path = path
+        # Used from the vectorizers' worker threads, one at a time
+        self.conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS gloss (h BLOB PRIMARY KEY, g TEXT NOT NULL)")
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get_many(self, texts: List[str]) -> Dict[str, str]:
+        """Return cached glosses for the given texts (misses are omitted)."""
+        keys = {self.key(text): text for text in texts}
+        key_list = list(keys)
+        found: Dict[str, str] = {}
+        for i in range(0, len(key_list), self._LOOKUP_CHUNK):
+            chunk = key_list[i:i + self._LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT h, g FROM gloss WHERE h IN ({placeholders})", chunk)
+            for h, g in rows:
+                found[keys[h]] = g
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Store (text, gloss) pairs in one transaction."""
+        rows = [(self.key(text), gloss) for text, gloss in items]
+        if not rows:
+            return
+        self.conn.execute("BEGIN")
+        self.conn.executemany("INSERT OR REPLACE INTO gloss (h, g) VALUES (?, ?)", rows)
+        self.conn.execute("COMMIT")
+
+    def close(self) -> None:
+        self.conn.close()
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
 import re
+import sqlite3
 import sys
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from enum import IntEnum
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Load environment variables from .env file
 try:
@@ -24,63 +29,110 @@ except ModuleNotFoundError as exc:
         "Missing dependency 'deep-translator'. Install it with 'pip install deep-translator' and retry."
     ) from exc
 
+try:
+    from langdetect import DetectorFactory, detect as detect_language
+    DetectorFactory.seed = 0  # Deterministic results
+except ImportError:
+    detect_language = None  # langdetect not installed, skip language check
+
+# Add parent directory to path for gtranslate module import
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from gtranslate.translate_service import RateLimiter, install_shared_session
+
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DEFAULT_INPUT = BASE_DIR / "md" / "User_Manual_IDX_Terminal_v1-0.mdx"
 DEFAULT_OUTPUT = DEFAULT_INPUT.with_suffix(".md")
+DEFAULT_CACHE = BASE_DIR / ".translate_cache.db"
 
 # Google Translate settings
 TARGET_LANGUAGE = "en"
 SOURCE_LANGUAGE = "id"  # auto for Auto-detect source language
-BATCH_DELAY = 0.1  # Small delay between translations to avoid rate limiting
+BATCH_SIZE = 100  # Max segments per worker task
+MAX_WORKERS = 8  # Concurrent translation requests
+MAX_QPS = 10.0  # Requests per second across all workers, to stay under Google's limit
 
+MIN_DETECT_LENGTH = 32  # Only run language detection on segments this long
 
-def is_code_fence(line: str) -> bool:
-    """Check if line is a code fence marker."""
-    stripped = line.strip()
-    return stripped.startswith("```")
+_thread_local = threading.local()
 
 
-def is_table_separator(line: str) -> bool:
-    """Check if line is a table separator (e.g., | --- | --- |)."""
-    stripped = line.strip()
-    if not stripped.startswith("|"):
-        return False
-    # Table separator contains only |, -, :, and whitespace
-    return all(c in "|-: \t" for c in stripped)
+_HEADING_MARKER_RE = re.compile(r"(#{1,6})\s+(.*)$")
+_URL_RE = re.compile(r"(https?://|www\.)\S+$")
+_TABLE_SEP_STRIP = str.maketrans("", "", "|-: \t")
 
 
-def is_table_line(line: str) -> bool:
-    """Check if line is part of a markdown table."""
-    stripped = line.strip()
-    return "|" in line and not stripped.startswith("//")
+class LineKind(IntEnum):
+    """Markdown line categories that drive translation."""
 
+    BLANK = 0
+    CODE_FENCE = 1
+    IMAGE = 2
+    TABLE = 3
+    LIST_ITEM = 4
+    HEADING = 5
+    TEXT = 6
 
-def is_image_line(line: str) -> bool:
-    """Check if line contains a markdown image."""
-    stripped = line.strip()
-    return stripped.startswith("![") and "](" in stripped
 
+# Leading character -> (required prefix, kind) for markers that win over tables
+_PREFIX_KINDS = {
+    "`": ("```", LineKind.CODE_FENCE),
+    "!": ("![", LineKind.IMAGE),
+}
+# Leading character -> kind for the remaining single-character markers
+_LEAD_KINDS = {
+    "-": LineKind.LIST_ITEM,
+    "*": LineKind.LIST_ITEM,
+    "+": LineKind.LIST_ITEM,
+    "#": LineKind.HEADING,
+}
+
+
+def is_ordered_marker(s: str) -> bool:
+    """Check if a stripped line starts with an ordered list marker ("1. ", "2) ")."""
+    i, n = 0, len(s)
+    while i < n and s[i].isdecimal():
+        i += 1
+    return 0 < i < n - 1 and s[i] in ".)" and s[i + 1].isspace()
 
-def is_list_item(line: str) -> bool:
-    """Check if line is a list item."""
-    stripped = line.strip()
-    # Unordered list
-    if stripped.startswith(("-", "*", "+")):
-        return True
-    # Ordered list (starts with number followed by dot or parenthesis)
-    if re.match(r"^\d+[\.\)]\s", stripped):
-        return True
-    return False
 
+def classify_line(line: str) -> Tuple[LineKind, str, str]:
+    """Classify a markdown line by inspecting its first non-space character.
 
-def is_heading(line: str) -> bool:
-    """Check if line is a markdown heading."""
+    Returns:
+        (kind, indent, stripped) tuple so callers don't strip the line again
+    """
+    s_left = line.lstrip()
+    s = s_left.rstrip()
+    indent = line[:len(line) - len(s_left)]
+    if not s:
+        return LineKind.BLANK, indent, s
+    c = s[0]
+
+    prefix_kind = _PREFIX_KINDS.get(c)
+    if prefix_kind is not None:
+        prefix, kind = prefix_kind
+        if s.startswith(prefix) and (kind is LineKind.CODE_FENCE or "](" in s):
+            return kind, indent, s
+    if "|" in s and not s.startswith("//"):
+        return LineKind.TABLE, indent, s
+
+    kind = _LEAD_KINDS.get(c)
+    if kind is not None:
+        return kind, indent, s
+    if is_ordered_marker(s):
+        return LineKind.LIST_ITEM, indent, s
+    return LineKind.TEXT, indent, s
+
+
+def is_table_separator(line: str) -> bool:
+    """Check if line is a table separator (e.g., | --- | --- |)."""
     stripped = line.strip()
-    return stripped.startswith("#")
+    # Table separator contains only |, -, :, and whitespace
+    return stripped.startswith("|") and not stripped.translate(_TABLE_SEP_STRIP)
 
 
-def extract_list_marker(line: str) -> tuple[str, str]:
+def extract_list_marker(line: str, indent: str, stripped: str) -> tuple[str, str]:
     """Extract list marker and content from a list item.
 
     Returns:
@@ -88,65 +140,216 @@ def extract_list_marker(line: str) -> tuple[str, str]:
         e.g., "- Hello world" -> ("- ", "Hello world")
               "1. Hello world" -> ("1. ", "Hello world")
     """
-    stripped = line.strip()
-
-    # Unordered list
-    for marker in ["-", "*", "+"]:
-        if stripped.startswith(marker):
-            content = stripped[1:].strip()
-            # Preserve original indentation
-            indent = line[:len(line) - len(line.lstrip())]
-            return f"{indent}{marker} ", content
-
-    # Ordered list
-    match = re.match(r"^(\s*)(\d+[\.\)])\s+(.*)$", line)
-    if match:
-        indent, number, content = match.groups()
-        return f"{indent}{number} ", content
+    # Unordered list (original indentation preserved)
+    marker = stripped[:1]
+    if marker in ("-", "*", "+"):
+        return f"{indent}{marker} ", stripped[1:].strip()
+
+    # Ordered list: digits, then "." or ")"
+    if is_ordered_marker(stripped):
+        end = 1
+        while stripped[end].isdecimal():
+            end += 1
+        end += 1
+        return f"{indent}{stripped[:end]} ", line[len(indent) + end:].lstrip()
 
     return "", stripped
 
 
-def extract_heading_marker(line: str) -> tuple[str, str]:
+def extract_heading_marker(stripped: str) -> tuple[str, str]:
     """Extract heading marker and content.
 
     Returns:
         (marker, content) tuple
         e.g., "## Hello" -> ("## ", "Hello")
     """
-    stripped = line.strip()
-    match = re.match(r"^(#{1,6})\s+(.*)$", stripped)
+    match = _HEADING_MARKER_RE.match(stripped)
     if match:
         hashes, content = match.groups()
         return f"{hashes} ", content
     return "", stripped
 
 
-def translate_text(translator: GoogleTranslator, text: str, line_num: int) -> str:
-    """Translate a single text string using Google Translate.
+@functools.lru_cache(maxsize=4096)
+def _detected_language(text: str) -> Optional[str]:
+    try:
+        return detect_language(text)
+    except Exception:
+        return None
 
-    Args:
-        translator: GoogleTranslator instance (from deep-translator)
-        text: Text to translate
-        line_num: Line number for error reporting
 
-    Returns:
-        Translated text
+def needs_translation(text: str, dest_lang: Optional[str] = None) -> bool:
+    """Check whether a segment is worth sending to Google Translate.
+
+    Skips very short segments, ASCII without letters (numbers, versions,
+    punctuation), bare URLs and, when langdetect is installed and dest_lang
+    is given, long segments already in the target language.
+    """
+    text = text.strip()
+    if len(text) < 2:
+        return False
+    if text.isascii() and not any(c.isalpha() for c in text):
+        return False
+    if _URL_RE.match(text):
+        return False
+    if (
+        dest_lang
+        and detect_language is not None
+        and len(text) > MIN_DETECT_LENGTH
+        and _detected_language(text) == dest_lang
+    ):
+        return False
+    return True
+
+
+class TranslationCache:
+    """Persistent SQLite cache of translations keyed by a hash of (source, target, text)."""
+
+    _LOOKUP_CHUNK = 500  # Stay under SQLite's bound-parameter limit
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(str(path), isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS t (k TEXT PRIMARY KEY, v TEXT NOT NULL)")
+
+    @staticmethod
+    def key(src_lang: str, dest_lang: str, text: str) -> str:
+        data = f"{src_lang}\0{dest_lang}\0{text}".encode("utf-8")
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+    def get_many(self, src_lang: str, dest_lang: str, texts: List[str]) -> Dict[str, str]:
+        """Return cached translations for the given texts (misses are omitted)."""
+        keys = {self.key(src_lang, dest_lang, text): text for text in texts}
+        key_list = list(keys)
+        found: Dict[str, str] = {}
+        for i in range(0, len(key_list), self._LOOKUP_CHUNK):
+            chunk = key_list[i:i + self._LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT k, v FROM t WHERE k IN ({placeholders})", chunk)
+            for k, v in rows:
+                found[keys[k]] = v
+        return found
+
+    def put_many(self, src_lang: str, dest_lang: str, items: Iterable[Tuple[str, str]]) -> None:
+        """Store (text, translation) pairs in one transaction."""
+        rows = [(self.key(src_lang, dest_lang, text), translated) for text, translated in items]
+        if not rows:
+            return
+        self.conn.execute("BEGIN")
+        self.conn.executemany("INSERT OR IGNORE INTO t (k, v) VALUES (?, ?)", rows)
+        self.conn.execute("COMMIT")
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def get_translator(src_lang: str, dest_lang: str) -> GoogleTranslator:
+    """Get this thread's translator for a language pair.
+
+    GoogleTranslator keeps the request parameters on the instance, so each
+    worker thread needs its own.
     """
-    if not text or not text.strip():
-        return text
+    translators = getattr(_thread_local, "translators", None)
+    if translators is None:
+        translators = _thread_local.translators = {}
+    translator = translators.get((src_lang, dest_lang))
+    if translator is None:
+        translator = translators[(src_lang, dest_lang)] = GoogleTranslator(source=src_lang, target=dest_lang)
+    return translator
+
 
+def try_translate(translator: GoogleTranslator, text: str, line_num: int) -> Optional[str]:
+    """Translate a single text string, returning None (after a warning) on failure."""
     try:
-        result = translator.translate(text)
-        time.sleep(BATCH_DELAY)  # Rate limiting
-        return result
+        return translator.translate(text)
     except Exception as exc:
         print(f"⚠ Warning: Translation failed for line {line_num}: {exc}")
         print(f"  Original: {text[:100]}")
-        return text  # Return original if translation fails
+        return None
+
 
+def translate_segments(
+    texts: List[str],
+    line_nums: Dict[str, int],
+    src_lang: str,
+    dest_lang: str,
+    workers: int = MAX_WORKERS,
+    batch_size: int = BATCH_SIZE,
+    cache: Optional[TranslationCache] = None,
+    qps: float = MAX_QPS,
+) -> Dict[str, str]:
+    """Translate unique text segments in concurrent batches.
+
+    Args:
+        texts: Unique segments to translate
+        line_nums: Segment -> first line number (for error reporting)
+        src_lang: Source language code
+        dest_lang: Destination language code
+        workers: Number of concurrent worker threads
+        batch_size: Max segments per worker task
+        cache: Optional persistent cache; hits skip the network, new
+            translations are stored (failed ones are not)
+        qps: Max translation requests per second across workers (0 = unlimited)
 
-def translate_markdown_line_by_line(lines: List[str], src_lang: str, dest_lang: str) -> List[str]:
+    Returns:
+        Mapping of segment -> translated text
+    """
+    translations: Dict[str, str] = {}
+    if cache is not None and texts:
+        translations = cache.get_many(src_lang, dest_lang, texts)
+        print(f"Cache: {len(translations)}/{len(texts)} segments already translated")
+        texts = [text for text in texts if text not in translations]
+
+    if not texts:
+        return translations
+
+    workers = max(1, workers)
+    # Spread small documents across all workers instead of filling one batch
+    size = max(1, min(batch_size, -(-len(texts) // workers)))
+    batches = [texts[i:i + size] for i in range(0, len(texts), size)]
+
+    limiter = RateLimiter(qps)
+
+    def run(batch: List[str]) -> List[Optional[str]]:
+        translator = get_translator(src_lang, dest_lang)
+        results: List[Optional[str]] = []
+        for text in batch:
+            limiter.acquire()
+            results.append(try_translate(translator, text, line_nums[text]))
+        return results
+
+    fresh: List[Tuple[str, str]] = []
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            for text, result in zip(batch, future.result()):
+                if result is None:
+                    translations[text] = text  # Keep original if translation fails
+                else:
+                    translations[text] = result
+                    fresh.append((text, result))
+            done += len(batch)
+            print(f"Progress: [{done}/{len(texts)}] {done / len(texts) * 100:.1f}%")
+
+    if cache is not None:
+        cache.put_many(src_lang, dest_lang, fresh)
+
+    return translations
+
+
+def translate_markdown_line_by_line(
+    lines: Iterable[str],
+    src_lang: str,
+    dest_lang: str,
+    workers: int = MAX_WORKERS,
+    batch_size: int = BATCH_SIZE,
+    cache: Optional[TranslationCache] = None,
+    qps: float = MAX_QPS,
+) -> Iterator[str]:
     """Translate markdown content line by line following the rules.
 
     Rules:
@@ -156,35 +359,42 @@ def translate_markdown_line_by_line(lines: List[str], src_lang: str, dest_lang:
     4. Ignore images, paste as-is
     5. Translate list items line by line
 
+    Lines are classified first; the translatable segments are then
+    de-duplicated and translated concurrently, and put back in order.
+
     Args:
-        lines: List of lines to translate
+        lines: Iterable of lines to translate (without line endings)
         src_lang: Source language code
         dest_lang: Destination language code
+        workers: Number of concurrent translation workers
+        batch_size: Max segments per worker task
+        cache: Optional persistent translation cache
+        qps: Max translation requests per second across workers (0 = unlimited)
 
-    Returns:
-        List of translated lines
+    Yields:
+        Translated lines, in order
     """
-    # Create translator instance with source and target languages
-    # For auto-detection, use 'auto' as source
-    translator = GoogleTranslator(source=src_lang, target=dest_lang)
-
-    translated_lines: List[str] = []
+    # Untranslated lines as-is; None marks a line filled in from segments
+    translated_lines: List[Optional[str]] = []
+    # (marker/indent, content) for each line to translate, in line order
+    segments: List[Tuple[str, str]] = []
+    # Unique content -> first line number
+    line_nums: Dict[str, int] = {}
     in_code_block = False
-    in_table = False
-    total_lines = len(lines)
-    translated_count = 0
 
-    print(f"\nTranslating {total_lines} lines...")
-    print("=" * 70)
+    def queue(line: str, marker: str, content: str, line_num: int) -> None:
+        if not needs_translation(content, dest_lang):
+            translated_lines.append(line)
+            return
+        segments.append((marker, content))
+        line_nums.setdefault(content, line_num)
+        translated_lines.append(None)  # Filled in after translation
 
     for line_num, line in enumerate(lines, 1):
-        # Show progress
-        if line_num % 50 == 0 or line_num == total_lines:
-            progress = (line_num / total_lines) * 100
-            print(f"Progress: [{line_num}/{total_lines}] {progress:.1f}% | Translated: {translated_count}")
+        kind, indent, stripped = classify_line(line)
 
         # Handle code blocks
-        if is_code_fence(line):
+        if kind is LineKind.CODE_FENCE:
             in_code_block = not in_code_block
             translated_lines.append(line)
             continue
@@ -194,59 +404,36 @@ def translate_markdown_line_by_line(lines: List[str], src_lang: str, dest_lang:
             translated_lines.append(line)
             continue
 
-        # Handle images
-        if is_image_line(line):
-            # Image line: no translation
-            translated_lines.append(line)
-            continue
-
-        # Handle tables
-        if is_table_line(line):
-            if not in_table:
-                in_table = True
-            translated_lines.append(line)
-            continue
-        else:
-            if in_table:
-                in_table = False
-
-        # Handle empty lines
-        if not line.strip():
+        # Images, tables and empty lines: no translation
+        if kind <= LineKind.TABLE:
             translated_lines.append(line)
             continue
 
-        # Handle list items
-        if is_list_item(line):
-            marker, content = extract_list_marker(line)
-            if content.strip():
-                translated_content = translate_text(translator, content, line_num)
-                translated_lines.append(f"{marker}{translated_content}")
-                translated_count += 1
+        # Handle list items and headings
+        if kind is LineKind.LIST_ITEM or kind is LineKind.HEADING:
+            if kind is LineKind.LIST_ITEM:
+                marker, content = extract_list_marker(line, indent, stripped)
             else:
-                translated_lines.append(line)
-            continue
-
-        # Handle headings
-        if is_heading(line):
-            marker, content = extract_heading_marker(line)
+                marker, content = extract_heading_marker(stripped)
             if content.strip():
-                translated_content = translate_text(translator, content, line_num)
-                translated_lines.append(f"{marker}{translated_content}")
-                translated_count += 1
+                queue(line, marker, content, line_num)
             else:
                 translated_lines.append(line)
             continue
 
-        # Regular text line: translate
-        if line.strip():
-            translated_line = translate_text(translator, line.strip(), line_num)
-            # Preserve original indentation
-            indent = line[:len(line) - len(line.lstrip())]
-            translated_lines.append(f"{indent}{translated_line}")
-            translated_count += 1
-        else:
-            translated_lines.append(line)
+        # Regular text line: translate, preserving original indentation
+        queue(line, indent, stripped, line_num)
 
+    total_lines = len(translated_lines)
+    print(f"\nTranslating {len(segments)} of {total_lines} lines "
+          f"({len(line_nums)} unique segments, {workers} workers)...")
+    print("=" * 70)
+
+    translations = translate_segments(
+        list(line_nums), line_nums, src_lang, dest_lang, workers, batch_size, cache, qps
+    )
+
+    translated_count = len(segments)
     print("=" * 70)
     print(f"✓ Translation complete!")
     print(f"  Total lines: {total_lines}")
@@ -254,7 +441,12 @@ def translate_markdown_line_by_line(lines: List[str], src_lang: str, dest_lang:
     print(f"  Skipped lines: {total_lines - translated_count}")
     print("=" * 70)
 
-    return translated_lines
+    pending = iter(segments)
+    for line in translated_lines:
+        if line is None:
+            marker, content = next(pending)
+            line = f"{marker}{translations[content]}"
+        yield line
 
 
 def main() -> None:
@@ -286,10 +478,42 @@ def main() -> None:
         default=TARGET_LANGUAGE,
         help="Target language code (default: en)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"Concurrent translation requests (default: {MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Max segments per worker task (default: {BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--qps",
+        type=float,
+        default=MAX_QPS,
+        help=f"Max translation requests per second, 0 for no limit (default: {MAX_QPS:g})",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=DEFAULT_CACHE,
+        help="SQLite translation cache; unchanged lines are not re-translated (default: .translate_cache.db)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Translate everything without reading or writing the cache",
+    )
     args = parser.parse_args()
 
     if not args.input.exists():
         raise SystemExit(f"Input file not found: {args.input}")
+    if args.output.resolve() == args.input.resolve():
+        # Output is written while the input is still being read
+        raise SystemExit("Output file must differ from the input file")
 
     print(f"\n{'='*70}")
     print(f"Google Translate Markdown Converter")
@@ -300,25 +524,34 @@ def main() -> None:
     print(f"Target language: {args.target}")
     print(f"{'='*70}")
 
-    # Read input file
-    source_text = args.input.read_text(encoding="utf-8")
-    source_lines = source_text.splitlines()
-
-    print(f"\nInput file: {len(source_text)} characters, {len(source_lines)} lines")
-
-    # Translate line by line
-    translated_lines = translate_markdown_line_by_line(source_lines, args.source, args.target)
-
-    # Write output
-    result = "\n".join(translated_lines)
-    if not result.endswith("\n"):
-        result += "\n"
-
-    args.output.write_text(result, encoding="utf-8")
+    input_size = args.input.stat().st_size
+    print(f"\nInput file: {input_size} bytes")
 
+    # Translate line by line, streaming from the input file to the output file
+    install_shared_session(max(args.workers, 16))
+    cache = None if args.no_cache else TranslationCache(args.cache)
+    output_lines = 0
+    try:
+        with args.input.open(encoding="utf-8") as src, \
+                args.output.open("w", encoding="utf-8") as out:
+            source_lines = (line.rstrip("\n") for line in src)
+            for line in translate_markdown_line_by_line(
+                source_lines, args.source, args.target, args.workers, args.batch_size, cache,
+                args.qps,
+            ):
+                out.write(line)
+                out.write("\n")
+                output_lines += 1
+            if not output_lines:
+                out.write("\n")
+    finally:
+        if cache is not None:
+            cache.close()
+
+    output_size = args.output.stat().st_size
     print(f"\n✓ Translated markdown written to {args.output}")
-    print(f"  Output: {len(result)} characters, {len(translated_lines)} lines")
-    print(f"  Size ratio: {len(result)/len(source_text)*100:.1f}%\n")
+    print(f"  Output: {output_size} bytes, {output_lines} lines")
+    print(f"  Size ratio: {output_size / max(input_size, 1) * 100:.1f}%\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+"""
+Helpers shared by the vectorizers (vectorize.py and vectorize_catalog.py).
+
+Usage:
+    glosses = pool.map(try_gloss, texts)        # exceptions returned, not raised
+    stored = existing_ids(collection, ids)      # ids already in the collection
+    enable_fast_ingest(collection)              # from the thread that writes
+"""
+
+from __future__ import annotations
+
+from typing import List, Union
+
+from chromadb.api.models.Collection import Collection
+
+from llm import get_gloss
+
+# Per-connection SQLite settings for bulk loads: no rollback journal and no
+# fsync. Much faster, but a crash mid-ingest can corrupt the index.
+FAST_INGEST_PRAGMAS = (
+    "journal_mode=OFF",
+    "synchronous=OFF",
+    "temp_store=MEMORY",
+    "cache_size=-262144",  # 256 MiB page cache
+)
+
+
+def try_gloss(text: str) -> Union[str, Exception]:
+    """Generate a gloss, returning the exception instead of raising it."""
+    try:
+        return get_gloss(text)
+    except Exception as exc:
+        return exc
+
+
+def existing_ids(collection: Collection, ids: List[str], lookup_size: int = 1000) -> set:
+    """Return the subset of ids already stored in the collection."""
+    stored = set()
+    for start in range(0, len(ids), lookup_size):
+        stored.update(collection.get(ids=ids[start:start + lookup_size], include=[])["ids"])
+    return stored
+
+
+def enable_fast_ingest(collection: Collection) -> bool:
+    """Apply FAST_INGEST_PRAGMAS to the Chroma SQLite connection of this thread.
+
+    Chroma keeps one SQLite connection per thread, so call this from the
+    thread that performs the writes. Relies on Chroma internals; returns
+    False (and changes nothing) if they are not where expected.
+    """
+    sysdb = getattr(getattr(collection, "_client", None), "_sysdb", None)
+    pool = getattr(sysdb, "_conn_pool", None)
+    if pool is None:
+        print("⚠ --fast-ingest: Chroma SQLite connection not found, using default settings")
+        return False
+    conn = pool.connect()
+    try:
+        for pragma in FAST_INGEST_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}")
+    finally:
+        pool.return_to_pool(conn)
+    return True
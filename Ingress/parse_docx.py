@@ -2,15 +2,34 @@
 # Converts .docx files in the 'docx' directory to JSONL chunk files in the 'output/chunks' directory,
 # extracting images to 'output/images'.
 #
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import os
 try:
-    from docx import Document
-    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+    from lxml import etree  # installed with python-docx
 except ModuleNotFoundError as exc:
     raise SystemExit(
         "Missing dependency 'python-docx'. Install it with 'pip install python-docx' and retry."
     ) from exc
-import json, hashlib, re, zipfile, shutil, tempfile
+try:
+    import orjson
+except ModuleNotFoundError as exc:
+    raise SystemExit(
+        "Missing dependency 'orjson'. Install it with 'pip install orjson' and retry."
+    ) from exc
+import hashlib, re, zipfile, shutil, tempfile
+
+# Optional SIMD inflate for zipfile (used by extract_images and python-docx):
+#   pip install isal   (or: pip install zlib-ng)
+try:
+    from isal import isal_zlib as _fast_zlib
+except ImportError:
+    try:
+        from zlib_ng import zlib_ng as _fast_zlib
+    except ImportError:
+        _fast_zlib = None
+if _fast_zlib is not None:
+    zipfile.zlib = _fast_zlib
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DOCX_DIR = BASE_DIR / "docx"
@@ -19,35 +38,104 @@ IMAGE_ROOT = BASE_DIR / "output" / "images"
 CHUNK_DIR.mkdir(parents=True, exist_ok=True)
 IMAGE_ROOT.mkdir(parents=True, exist_ok=True)
 
-def slug(s): return re.sub(r'[^a-z0-9]+','-', s.lower()).strip('-')
+COPY_BUFSIZE = 1 << 20          # 1 MiB copy buffer for large media entries
+INMEMORY_MEDIA_MAX = 8 << 20    # media up to this size is inflated in one read
+WRITE_BUFSIZE = 1 << 20         # flush serialized JSONL records in ~1 MiB writes
+
+_STYLE_NUM = re.compile(r'\d+')
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_BODY, W_P, W_R, W_HYPERLINK = W_NS + "body", W_NS + "p", W_NS + "r", W_NS + "hyperlink"
+W_VAL, W_TYPE = W_NS + "val", W_NS + "type"
+# run children -> text, mirroring python-docx's Run.text
+_RUN_TEXT = {W_NS + "tab": "\t", W_NS + "ptab": "\t", W_NS + "cr": "\n", W_NS + "noBreakHyphen": "-"}
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+def slug(s): return _SLUG_RE.sub('-', s.lower()).strip('-')
+
+def source_stamp(path):
+    st = path.stat()
+    return f"{st.st_mtime_ns}:{st.st_size}"
 
 def extract_images(docx_path, img_dir):
+    # unchanged docx since the last run -> media on disk is already current
+    stamp_path, stamp = img_dir / ".stamp", source_stamp(docx_path)
+    try:
+        if stamp_path.read_text() == stamp: return
+    except OSError: pass
     shutil.rmtree(img_dir, ignore_errors=True)
     img_dir.mkdir(parents=True, exist_ok=True)
     # unzip the docx and copy media/* out (Word stores images in word/media)
     with zipfile.ZipFile(docx_path) as z:
-        for n in z.namelist():
+        for info in z.infolist():
+            n = info.filename
             if n.startswith("word/media/"):
                 target = img_dir / Path(n).name
-                with z.open(n) as src, open(target, "wb") as dst:
-                    shutil.copyfileobj(src, dst)
+                if info.file_size <= INMEMORY_MEDIA_MAX:
+                    # single C-level inflate + write, no Python copy loop
+                    target.write_bytes(z.read(info))
+                else:
+                    with z.open(info) as src, open(target, "wb") as dst:
+                        shutil.copyfileobj(src, dst, COPY_BUFSIZE)
+    stamp_path.write_text(stamp)
+
+def load_style_names(z):
+    # styleId -> display name (pStyle refers to ids, headings are recognised by name)
+    names, default = {}, ""
+    try: data = z.read("word/styles.xml")
+    except KeyError: return names, default
+    for st in etree.fromstring(data).iterchildren(W_NS + "style"):
+        if st.get(W_TYPE) != "paragraph": continue
+        name_el = st.find(W_NS + "name")
+        name = name_el.get(W_VAL, "") if name_el is not None else ""
+        names[st.get(W_NS + "styleId")] = name
+        if st.get(W_NS + "default") in ("1", "true", "on"): default = name
+    return names, default
+
+def _run_text(r):
+    out = []
+    for c in r:
+        if c.tag == W_NS + "t": out.append(c.text or "")
+        elif c.tag == W_NS + "br":
+            if c.get(W_TYPE, "textWrapping") == "textWrapping": out.append("\n")
+        else: out.append(_RUN_TEXT.get(c.tag, ""))
+    return "".join(out)
+
+def iter_paragraphs(z):
+    # stream top-level <w:p> out of document.xml as (style name, text), freeing each as we go
+    names, default = load_style_names(z)
+    with z.open("word/document.xml") as f:
+        for _, p in etree.iterparse(f, events=("end",), tag=W_P):
+            parent = p.getparent()
+            if parent is None or parent.tag != W_BODY: continue  # table cells etc. aren't in doc.paragraphs
+            ps = p.find(f"{W_NS}pPr/{W_NS}pStyle")
+            style = names.get(ps.get(W_VAL), default) if ps is not None else default
+            parts = []
+            for c in p:
+                if c.tag == W_R: parts.append(_run_text(c))
+                elif c.tag == W_HYPERLINK: parts.extend(_run_text(r) for r in c.iterchildren(W_R))
+            yield style, "".join(parts)
+            p.clear()
+            while p.getprevious() is not None: del parent[0]
 
-def iterate_topics(doc: Document):
+def iterate_topics(paragraphs):
     current = {"h1": None, "h2": None, "h3": None, "paras": []}
-    for p in doc.paragraphs:
-        style = (p.style.name or "").lower()
+    for style, text in paragraphs:
+        style = (style or "").lower()
+        text = text.strip()
         if style.startswith("heading"):
             # yield previous topic if it has content
             if current["h1"] or current["paras"]:
                 yield current
                 current = {"h1": None, "h2": None, "h3": None, "paras": []}
-            level = int(re.findall(r'\d+', style)[0]) if re.findall(r'\d+', style) else 1
-            if level == 1: current["h1"] = p.text.strip()
-            elif level == 2: current["h2"] = p.text.strip()
-            else: current["h3"] = p.text.strip()
+            m = _STYLE_NUM.search(style)
+            level = int(m.group()) if m else 1
+            if level == 1: current["h1"] = text
+            elif level == 2: current["h2"] = text
+            else: current["h3"] = text
         else:
-            if p.text.strip():
-                current["paras"].append(p.text.strip())
+            if text:
+                current["paras"].append(text)
     if current["h1"] or current["paras"]:
         yield current
 
@@ -67,13 +155,13 @@ def chunk_text(texts, target_tokens=600, overlap=80):
     return chunks
 
 def process_docx(docx_path: Path):
-    doc = Document(docx_path)
     image_dir = IMAGE_ROOT / docx_path.stem
     extract_images(docx_path, image_dir)
     chunk_path = CHUNK_DIR / f"{docx_path.stem}.jsonl"
 
-    with open(chunk_path, "w", encoding="utf-8") as f:
-        for topic in iterate_topics(doc):
+    with zipfile.ZipFile(docx_path) as z, open(chunk_path, "wb") as f:
+        buf = bytearray()
+        for topic in iterate_topics(iter_paragraphs(z)):
             title = " / ".join([x for x in [topic["h1"], topic["h2"], topic["h3"]] if x]) or "Untitled"
             parts = chunk_text(topic["paras"])
             for i, body in enumerate(parts):
@@ -85,7 +173,10 @@ def process_docx(docx_path: Path):
                     "images": [],
                     "source": {"kind": "docx", "file": docx_path.name}
                 }
-                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                buf += orjson.dumps(rec, option=orjson.OPT_APPEND_NEWLINE)
+                if len(buf) >= WRITE_BUFSIZE:
+                    f.write(buf); buf.clear()
+        if buf: f.write(buf)
 
 
 def main():
@@ -96,8 +187,14 @@ def main():
     if not docx_files:
         raise SystemExit(f"No .docx files found in {DOCX_DIR}")
 
-    for path in docx_files:
-        process_docx(path)
+    # files are independent (own jsonl + image dir), so fan out across cores
+    workers = min(len(docx_files), os.cpu_count() or 1)
+    if workers <= 1:
+        for path in docx_files:
+            process_docx(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(process_docx, docx_files))
 
 if __name__ == "__main__":
     main()
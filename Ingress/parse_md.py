@@ -1,13 +1,21 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import os
 import re
 import shlex
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict
 
+try:
+    import orjson
+except ModuleNotFoundError as exc:
+    raise SystemExit(
+        "Missing dependency 'orjson'. Install it with 'pip install orjson' and retry."
+    ) from exc
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 MD_DIR = BASE_DIR / "md"
 OUT_DIR = BASE_DIR / "output"
@@ -17,10 +25,16 @@ IMAGE_ROOT = OUT_DIR / "images"
 CHUNK_DIR.mkdir(parents=True, exist_ok=True)
 IMAGE_ROOT.mkdir(parents=True, exist_ok=True)
 
-HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)$")
-CODE_FENCE_PATTERN = re.compile(r"^(```|~~~)")
+# A code fence line (leading whitespace allowed) or an ATX heading line,
+# matched across the whole document; [^\S\n] keeps whitespace within a line
+FENCE_OR_HEADING_PATTERN = re.compile(
+    r"^(?:[^\S\n]*(?P<fence>```|~~~).*|(?P<hashes>#{1,6})[^\S\n]+(?P<title>.*))$",
+    re.MULTILINE,
+)
 IMAGE_PATTERN = re.compile(r"!\[(?P<alt>[^\]]*)\]\((?P<dest>[^)]+)\)")
 WHITESPACE_RE = re.compile(r"\s+")
+# First token of an image destination, split on shlex's whitespace set
+DEST_HEAD_RE = re.compile(r"[^ \t\r\n]+")
 
 # Chunking configuration
 MIN_CHUNK_SIZE = 100  # tokens - keep small sections intact
@@ -36,6 +50,15 @@ def parse_image_destination(raw: str) -> str:
     cleaned = raw.strip()
     if cleaned.startswith("<") and cleaned.endswith(">"):
         cleaned = cleaned[1:-1]
+    # Plain `url` or `url "title"`: the first token is the destination. Only
+    # quoting/escaping inside that token needs the full shlex tokenizer.
+    head = DEST_HEAD_RE.search(cleaned)
+    if head is None:
+        return cleaned
+    head = head.group()
+    # (isprintable() also rules out Unicode whitespace that shlex keeps in a token)
+    if "\\" not in head and '"' not in head and "'" not in head and head.isprintable():
+        return head
     try:
         parts = shlex.split(cleaned)
     except ValueError:
@@ -49,6 +72,16 @@ def estimate_tokens(text: str) -> int:
 
 
 def copy_image(md_path: Path, dest: str, ctx: dict) -> str | None:
+    # Same destination seen before in this document: no stat()/copy needed
+    dest_to_rel = ctx["dest_to_rel"]
+    if dest in dest_to_rel:
+        return dest_to_rel[dest]
+    rel_path = _copy_image(md_path, dest, ctx)
+    dest_to_rel[dest] = rel_path
+    return rel_path
+
+
+def _copy_image(md_path: Path, dest: str, ctx: dict) -> str | None:
     url = dest.strip()
     if not url or url.startswith(("http://", "https://", "data:")):
         return url or None
@@ -88,6 +121,7 @@ def copy_image(md_path: Path, dest: str, ctx: dict) -> str | None:
 
 def replace_images(md_path: Path, text: str, ctx: dict) -> Tuple[str, List[str]]:
     found: List[str] = []
+    found_set = set()
 
     def _replace(match: re.Match) -> str:
         alt = sanitize_whitespace(match.group("alt"))
@@ -95,7 +129,8 @@ def replace_images(md_path: Path, text: str, ctx: dict) -> Tuple[str, List[str]]
         href = parse_image_destination(dest_raw)
         new_path = copy_image(md_path, href, ctx)
         if new_path:
-            if new_path not in found:
+            if new_path not in found_set:
+                found_set.add(new_path)
                 found.append(new_path)
             return f"![{alt}]({new_path})"
         return f"![{alt}]({href})"
@@ -106,15 +141,21 @@ def replace_images(md_path: Path, text: str, ctx: dict) -> Tuple[str, List[str]]
 
 def extract_images_from_text(text: str) -> List[str]:
     paths: List[str] = []
+    seen = set()
     for match in IMAGE_PATTERN.finditer(text):
         href = parse_image_destination(match.group("dest"))
-        if href and href not in paths:
+        if href and href not in seen:
+            seen.add(href)
             paths.append(href)
     return paths
 
 
 class Section:
-    """Represents a document section with heading hierarchy."""
+    """Represents a document section with heading hierarchy.
+
+    Call finalize() once the content is complete (i.e. after parsing); it
+    joins the text a single time into content_text / full_text.
+    """
 
     def __init__(
         self,
@@ -128,43 +169,62 @@ class Section:
         self.content = content
         self.parent = parent
         self.children: List[Section] = []
-
-    def get_heading_path(self) -> List[str]:
-        """Get full heading path from root to this section."""
-        if self.parent:
-            return self.parent.get_heading_path() + [self.title]
-        return [self.title] if self.title else []
-
-    def get_full_text(self) -> str:
-        """Get complete section text including title."""
-        parts = []
-        if self.title:
-            parts.append(f"{'#' * self.level} {self.title}")
-        if self.content:
-            parts.append("\n".join(self.content))
-        return "\n\n".join(parts)
-
-    def get_content_only(self) -> str:
-        """Get section content without title."""
-        return "\n".join(self.content) if self.content else ""
+        # Full heading path from root, built from the parent's path
+        if parent:
+            self.heading_path: Tuple[str, ...] = parent.heading_path + (title,)
+        else:
+            self.heading_path = (title,) if title else ()
+        # Set by finalize()
+        self.content_text = ""
+        self.full_text = ""
+        self.content_tokens = 1
+
+    def finalize(self) -> Section:
+        """Build the joined texts for this section and all its descendants."""
+        stack = [self]
+        while stack:
+            sect = stack.pop()
+            sect.content_text = "\n".join(sect.content)
+            header = f"{'#' * sect.level} {sect.title}" if sect.title else ""
+            if header and sect.content:
+                sect.full_text = f"{header}\n\n{sect.content_text}"
+            else:
+                sect.full_text = header or sect.content_text
+            sect.content_tokens = estimate_tokens(sect.content_text)
+            stack.extend(sect.children)
+        return self
 
     def add_child(self, child: Section):
         self.children.append(child)
 
 
+def iter_paragraphs(lines: List[str]):
+    """Yield stripped, non-empty paragraphs separated by blank lines."""
+    block: List[str] = []
+    for line in lines:
+        if line:
+            block.append(line)
+        elif block:
+            para = "\n".join(block).strip()
+            if para:
+                yield para
+            block = []
+    if block:
+        para = "\n".join(block).strip()
+        if para:
+            yield para
+
+
 def split_large_section(section: Section, max_size: int) -> List[Section]:
     """
     Split a large section into smaller chunks at paragraph boundaries.
     Preserves heading hierarchy.
     """
-    content = section.get_content_only()
-    tokens = estimate_tokens(content)
-
-    if tokens <= max_size:
+    if section.content_tokens <= max_size:
         return [section]
 
-    # Split at paragraph boundaries (double newline)
-    paragraphs = [p.strip() for p in content.split("\n\n") if p.strip()]
+    # Split at paragraph boundaries (blank lines)
+    paragraphs = iter_paragraphs(section.content)
 
     chunks = []
     current_chunk = []
@@ -180,7 +240,7 @@ def split_large_section(section: Section, max_size: int) -> List[Section]:
                 title=f"{section.title} (part {len(chunks) + 1})",
                 content=[para],
                 parent=section.parent
-            )
+            ).finalize()
             chunks.append(chunk_section)
             continue
 
@@ -191,7 +251,7 @@ def split_large_section(section: Section, max_size: int) -> List[Section]:
                 title=f"{section.title} (part {len(chunks) + 1})" if chunks else section.title,
                 content=current_chunk,
                 parent=section.parent
-            )
+            ).finalize()
             chunks.append(chunk_section)
             current_chunk = []
             current_tokens = 0
@@ -206,7 +266,7 @@ def split_large_section(section: Section, max_size: int) -> List[Section]:
             title=f"{section.title} (part {len(chunks) + 1})" if chunks else section.title,
             content=current_chunk,
             parent=section.parent
-        )
+        ).finalize()
         chunks.append(chunk_section)
 
     return chunks if chunks else [section]
@@ -225,47 +285,51 @@ def parse_markdown_by_sections(md_path: Path) -> List[Section]:
     root = Section(level=0, title="", content=[], parent=None)
     heading_stack.append(root)
 
-    with md_path.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            stripped = line.rstrip("\n")
-            fence = stripped.strip()
-
-            # Track code blocks to avoid parsing headings inside them
-            if CODE_FENCE_PATTERN.match(fence):
-                in_code_block = not in_code_block
-                current_content.append(stripped)
-                continue
+    text = md_path.read_text(encoding="utf-8")
+
+    def content_lines(start: int, stop: int) -> List[str]:
+        # Split on "\n" only (like file iteration), not splitlines(), which
+        # would also break on \x0c, \u2028 and friends
+        lines = text[start:stop].split("\n")
+        if not lines[-1]:
+            lines.pop()
+        return lines
+
+    # One C-level scan finds every fence and heading line; everything in
+    # between is plain content
+    pos = 0
+    for match in FENCE_OR_HEADING_PATTERN.finditer(text):
+        # Track code blocks to avoid parsing headings inside them
+        if match.group("fence"):
+            in_code_block = not in_code_block
+            continue
+        if in_code_block:
+            continue
 
-            if in_code_block:
-                current_content.append(stripped)
-                continue
+        level = len(match.group("hashes"))
+        title = sanitize_whitespace(match.group("title"))
 
-            # Check for heading
-            match = HEADING_PATTERN.match(stripped)
-            if match:
-                level = len(match.group(1))
-                title = sanitize_whitespace(match.group(2))
+        # Save current section's content
+        current_content.extend(content_lines(pos, match.start()))
+        if heading_stack:
+            heading_stack[-1].content.extend(current_content)
+            current_content = []
+        pos = match.end() + 1  # Skip the heading line and its newline
 
-                # Save current section's content
-                if heading_stack:
-                    heading_stack[-1].content.extend(current_content)
-                    current_content = []
+        # Find appropriate parent (pop stack until we find lower level)
+        while len(heading_stack) > 1 and heading_stack[-1].level >= level:
+            heading_stack.pop()
 
-                # Find appropriate parent (pop stack until we find lower level)
-                while len(heading_stack) > 1 and heading_stack[-1].level >= level:
-                    heading_stack.pop()
+        parent = heading_stack[-1] if heading_stack else None
+        new_section = Section(level=level, title=title, content=[], parent=parent)
 
-                parent = heading_stack[-1] if heading_stack else None
-                new_section = Section(level=level, title=title, content=[], parent=parent)
+        if parent:
+            parent.add_child(new_section)
 
-                if parent:
-                    parent.add_child(new_section)
+        heading_stack.append(new_section)
+        sections.append(new_section)
 
-                heading_stack.append(new_section)
-                sections.append(new_section)
-            else:
-                # Regular content line
-                current_content.append(stripped)
+    current_content.extend(content_lines(pos, len(text)))
 
     # Save final content
     if heading_stack and current_content:
@@ -275,6 +339,7 @@ def parse_markdown_by_sections(md_path: Path) -> List[Section]:
     if root.content and not root.children:
         sections.append(root)
 
+    root.finalize()
     return sections
 
 
@@ -285,74 +350,95 @@ def section_to_chunks(
     chunk_index: int
 ) -> Tuple[List[Dict], int]:
     """
-    Convert a section into one or more chunks with metadata.
+    Convert a section and its descendants into chunks with metadata.
     """
     chunks = []
 
-    # Get full text
-    full_text = section.get_full_text()
-    tokens = estimate_tokens(full_text)
+    # Walk the section and its descendants depth-first (pre-order) with an
+    # explicit stack instead of recursing per child
+    stack = [section]
+    while stack:
+        section = stack.pop()
 
-    # Determine if we need to split this section
-    sections_to_process = [section]
-    if tokens > MAX_CHUNK_SIZE:
-        sections_to_process = split_large_section(section, MAX_CHUNK_SIZE)
+        # Get full text
+        full_text = section.full_text
+        tokens = estimate_tokens(full_text)
 
-    for sect in sections_to_process:
-        text = sect.get_full_text()
-        tokens = estimate_tokens(text)
+        # Determine if we need to split this section
+        sections_to_process = [section]
+        if tokens > MAX_CHUNK_SIZE:
+            sections_to_process = split_large_section(section, MAX_CHUNK_SIZE)
 
-        # Skip very small sections (likely empty or just whitespace)
-        if tokens < 10:
-            continue
+        for sect in sections_to_process:
+            text = sect.full_text
+            tokens = estimate_tokens(text)
 
-        # Replace images and get updated text
-        replaced_text, images = replace_images(md_path, text, ctx)
-
-        # Build heading hierarchy path
-        heading_path = sect.get_heading_path()
-        title = " / ".join(heading_path) if heading_path else md_path.stem
-
-        # Generate chunk ID
-        chunk_id = hashlib.sha1(
-            f"{md_path.name}:{title}:{chunk_index}".encode("utf-8")
-        ).hexdigest()[:16]
-
-        # Create chunk record
-        record = {
-            "id": chunk_id,
-            "chunk_type": "section",
-            "heading_level": sect.level,
-            "heading_hierarchy": heading_path,
-            "title": title,
-            "section_title": sect.title,
-            "text": replaced_text,
-            "token_count": tokens,
-            "images": images,
-            "has_children": len(sect.children) > 0,
-            "parent_title": sect.parent.title if sect.parent and sect.parent.title else None,
-            "source": {
-                "kind": "markdown",
-                "file": md_path.name,
-                "section_index": chunk_index
+            # Skip very small sections (likely empty or just whitespace)
+            if tokens < 10:
+                continue
+
+            # Replace images and get updated text
+            replaced_text, images = replace_images(md_path, text, ctx)
+
+            # Build heading hierarchy path
+            heading_path = sect.heading_path
+            title = " / ".join(heading_path) if heading_path else md_path.stem
+
+            # Generate chunk ID
+            chunk_id = hashlib.sha1(
+                f"{md_path.name}:{title}:{chunk_index}".encode("utf-8")
+            ).hexdigest()[:16]
+
+            # Create chunk record
+            record = {
+                "id": chunk_id,
+                "chunk_type": "section",
+                "heading_level": sect.level,
+                "heading_hierarchy": list(heading_path),
+                "title": title,
+                "section_title": sect.title,
+                "text": replaced_text,
+                "token_count": tokens,
+                "images": images,
+                "has_children": len(sect.children) > 0,
+                "parent_title": sect.parent.title if sect.parent and sect.parent.title else None,
+                "source": {
+                    "kind": "markdown",
+                    "file": md_path.name,
+                    "section_index": chunk_index
+                }
             }
-        }
 
-        chunks.append(record)
-        chunk_index += 1
+            chunks.append(record)
+            chunk_index += 1
 
-    # Process children
-    for child in section.children:
-        child_chunks, chunk_index = section_to_chunks(child, md_path, ctx, chunk_index)
-        chunks.extend(child_chunks)
+        stack.extend(reversed(section.children))
 
     return chunks, chunk_index
 
 
+def source_stamp(path: Path) -> str:
+    """Cheap change marker for a source file: mtime (ns) and size."""
+    st = path.stat()
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
 def process_markdown(md_path: Path) -> None:
     """Process a markdown file into semantic chunks based on heading structure."""
 
     image_dir = IMAGE_ROOT / md_path.stem
+    output_path = CHUNK_DIR / f"{md_path.stem}.jsonl"
+
+    # Skip files whose chunks and images were produced from this exact source
+    stamp_path = image_dir / ".stamp"
+    stamp = source_stamp(md_path)
+    try:
+        if output_path.exists() and stamp_path.read_text() == stamp:
+            print(f"  ✓ Unchanged, skipping {md_path.name}")
+            return
+    except OSError:
+        pass
+
     shutil.rmtree(image_dir, ignore_errors=True)
     image_dir.mkdir(parents=True, exist_ok=True)
 
@@ -360,6 +446,7 @@ def process_markdown(md_path: Path) -> None:
         "image_dir": image_dir,
         "image_rel_root": Path("images") / md_path.stem,
         "copied": {},
+        "dest_to_rel": {},
     }
 
     # Parse markdown into sections
@@ -378,10 +465,10 @@ def process_markdown(md_path: Path) -> None:
         return
 
     # Write chunks to JSONL
-    output_path = CHUNK_DIR / f"{md_path.stem}.jsonl"
-    with output_path.open("w", encoding="utf-8") as writer:
-        for record in chunks:
-            writer.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output_path.write_bytes(b"".join(
+        orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in chunks
+    ))
+    stamp_path.write_text(stamp)
 
     print(f"  ✓ Generated {len(chunks)} semantic chunks from {md_path.name}")
 
@@ -399,8 +486,14 @@ def main() -> None:
     print(f"Max chunk size: {MAX_CHUNK_SIZE} tokens")
     print()
 
-    for md_file in md_files:
-        process_markdown(md_file)
+    # Each file writes its own JSONL and image directory, so convert in parallel
+    workers = min(len(md_files), os.cpu_count() or 1)
+    if workers <= 1:
+        for md_file in md_files:
+            process_markdown(md_file)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(process_markdown, md_files))
 
     print()
     print("✓ All files processed successfully!")
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import argparse
+import json
+import os
 import re
 import sys
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 # Load environment variables from .env file
 try:
@@ -19,7 +22,12 @@ except ImportError:
 
 # Add parent directory to path for gtranslate module import
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-from gtranslate.translate_service import translate_text, TranslationError
+from gtranslate.translate_service import (
+    RateLimiter,
+    TranslationError,
+    install_shared_session,
+    translate_text,
+)
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DEFAULT_INPUT = BASE_DIR / "md" / "User_Manual_IDX_Terminal_v1-0.mdx"
@@ -28,90 +36,122 @@ DEFAULT_OUTPUT = DEFAULT_INPUT.with_suffix(".md")
 # Translation settings
 DEFAULT_SOURCE_LANGUAGE = "id"  # Indonesian
 DEFAULT_TARGET_LANGUAGE = "en"  # English
-
-
-def is_code_fence(line: str) -> bool:
-    """Check if line is a code fence marker."""
-    stripped = line.strip()
-    return stripped.startswith("```")
-
-
-def is_table_line(line: str) -> bool:
-    """Check if line is part of a markdown table."""
-    stripped = line.strip()
-    return "|" in line and not stripped.startswith("//")
-
-
-def is_image_line(line: str) -> bool:
-    """Check if line contains a markdown image."""
-    stripped = line.strip()
-    return stripped.startswith("![") and "](" in stripped
-
-
-def is_list_item(line: str) -> bool:
-    """Check if line is a list item."""
-    stripped = line.strip()
-    # Unordered list
-    if stripped.startswith(("-", "*", "+")):
-        return True
-    # Ordered list (starts with number followed by dot or parenthesis)
-    if re.match(r"^\d+[\.\)]\s", stripped):
-        return True
-    return False
-
-
-def is_heading(line: str) -> bool:
-    """Check if line is a markdown heading."""
-    stripped = line.strip()
-    return stripped.startswith("#")
-
-
-def extract_list_marker(line: str) -> tuple[str, str]:
-    """Extract list marker and content from a list item.
+BATCH_SIZE = 100  # Max distinct texts dispatched per worker task
+MAX_WORKERS = 16  # Concurrent translation requests
+MAX_QPS = 10.0  # Requests per second across all workers, to stay under Google's limit
+CACHE_SAVE_INTERVAL = 200  # Persist the sidecar cache after this many new translations
+
+# Classifies a line in one scan: leading indent plus the construct it opens.
+# m.lastgroup names the construct ("indent" when the line opens none of them).
+LINE_RE = re.compile(
+    r"(?P<indent>\s*)(?:"
+    r"(?P<fence>```)"
+    r"|(?P<image>!\[)"
+    r"|(?P<comment>//)"
+    r"|(?P<number>\d+[.)])\s+(?=\S)"
+    r"|(?P<heading>#{1,6})\s+(?=\S)"
+    r"|(?P<bullet>[-*+])"
+    r"|(?P<hash>#)"
+    r")?"
+)
+
+# (source, target, text) -> translated text, shared across lines and reruns
+_cache: Dict[Tuple[str, str, str], str] = {}
+_unsaved_count = 0
+_cache_lock = threading.RLock()
+
+
+def cache_path_for(output_path: Path) -> Path:
+    """Sidecar translation cache stored next to the output file."""
+    return output_path.with_suffix(".trcache.json")
+
+
+def load_cache(path: Path) -> int:
+    """Load a sidecar translation cache into memory.
 
     Returns:
-        (marker, content) tuple
-        e.g., "- Hello world" -> ("- ", "Hello world")
-              "1. Hello world" -> ("1. ", "Hello world")
+        Number of cached translations loaded
     """
-    stripped = line.strip()
-
-    # Unordered list
-    for marker in ["-", "*", "+"]:
-        if stripped.startswith(marker):
-            content = stripped[1:].strip()
-            # Preserve original indentation
-            indent = line[:len(line) - len(line.lstrip())]
-            return f"{indent}{marker} ", content
-
-    # Ordered list
-    match = re.match(r"^(\s*)(\d+[\.\)])\s+(.*)$", line)
-    if match:
-        indent, number, content = match.groups()
-        return f"{indent}{number} ", content
-
-    return "", stripped
-
+    if not path.exists():
+        return 0
+    try:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        print(f"⚠ Ignoring unreadable translation cache {path}: {exc}")
+        return 0
+    for src_lang, dest_lang, text, translated in entries:
+        _cache[(src_lang, dest_lang, text)] = translated
+    return len(entries)
+
+
+def save_cache(path: Path) -> None:
+    """Atomically write the in-memory translation cache to its sidecar file."""
+    global _unsaved_count
+    with _cache_lock:
+        tmp_path = path.with_name(path.name + ".tmp")
+        entries = [[src, dest, text, translated] for (src, dest, text), translated in _cache.items()]
+        tmp_path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+        _unsaved_count = 0
+
+
+def translate_cached(
+    text: str,
+    src_lang: str,
+    dest_lang: str,
+    cache_path: Optional[Path] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> str:
+    """Translate text, serving repeated strings from the in-memory cache.
 
-def extract_heading_marker(line: str) -> tuple[str, str]:
-    """Extract heading marker and content.
+    New translations are periodically flushed to cache_path (if given) so an
+    interrupted run keeps its progress. Safe to call from worker threads.
 
-    Returns:
-        (marker, content) tuple
-        e.g., "## Hello" -> ("## ", "Hello")
+    Raises:
+        TranslationError: If the text is not cached and translation fails
     """
-    stripped = line.strip()
-    match = re.match(r"^(#{1,6})\s+(.*)$", stripped)
-    if match:
-        hashes, content = match.groups()
-        return f"{hashes} ", content
-    return "", stripped
+    global _unsaved_count
+    key = (src_lang, dest_lang, text)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    if limiter is not None:
+        limiter.acquire()
+    translated = translate_text(text, source=src_lang, target=dest_lang)
+    with _cache_lock:
+        _cache[key] = translated
+        _unsaved_count += 1
+        if cache_path is not None and _unsaved_count >= CACHE_SAVE_INTERVAL:
+            save_cache(cache_path)
+    return translated
+
+
+def translate_batch_cached(
+    texts: List[str],
+    src_lang: str,
+    dest_lang: str,
+    cache_path: Optional[Path] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> List[Optional[str]]:
+    """Translate a batch of texts, returning None for any that failed."""
+    results: List[Optional[str]] = []
+    for text in texts:
+        try:
+            results.append(translate_cached(text, src_lang, dest_lang, cache_path, limiter))
+        except TranslationError:
+            results.append(None)
+    return results
 
 
 def translate_markdown_line_by_line(
     lines: List[str],
     src_lang: str,
     dest_lang: str,
+    cache_path: Optional[Path] = None,
+    batch_size: int = BATCH_SIZE,
+    workers: int = MAX_WORKERS,
+    qps: float = MAX_QPS,
 ) -> List[str]:
     """Translate markdown content line by line using Google Translate.
 
@@ -122,33 +162,40 @@ def translate_markdown_line_by_line(
     4. Ignore images, paste as-is
     5. Translate list items line by line
 
+    The lines are scanned first to collect what needs translating; the
+    distinct uncached texts are then translated in concurrent batches and
+    spliced back.
+
     Args:
         lines: List of lines to translate
         src_lang: Source language code
         dest_lang: Destination language code
+        cache_path: Optional sidecar file for periodic cache saves
+        batch_size: Max distinct texts dispatched per worker task
+        workers: Number of concurrent worker threads
+        qps: Max translation requests per second across workers (0 = unlimited)
 
     Returns:
         List of translated lines
     """
-    translated_lines: List[str] = []
+    translated_lines: List[Optional[str]] = []
+    # (output index, marker/indent, content, line number) for each line to translate
+    pending: List[Tuple[int, str, str, int]] = []
     in_code_block = False
-    in_table = False
     total_lines = len(lines)
     translated_count = 0
     failed_count = 0
 
-    print(f"\nTranslating {total_lines} lines using Google Translate...")
-    print(f"Source: {src_lang} → Target: {dest_lang}")
-    print("=" * 70)
+    def defer(marker: str, content: str, line_num: int) -> None:
+        pending.append((len(translated_lines), marker, content, line_num))
+        translated_lines.append(None)  # Filled in after translation
 
     for line_num, line in enumerate(lines, 1):
-        # Show progress
-        if line_num % 50 == 0 or line_num == total_lines:
-            progress = (line_num / total_lines) * 100
-            print(f"Progress: [{line_num}/{total_lines}] {progress:.1f}% | Translated: {translated_count} | Failed: {failed_count}")
+        m = LINE_RE.match(line)
+        kind = m.lastgroup
 
         # Handle code blocks
-        if is_code_fence(line):
+        if kind == "fence":
             in_code_block = not in_code_block
             translated_lines.append(line)
             continue
@@ -159,73 +206,82 @@ def translate_markdown_line_by_line(
             continue
 
         # Handle images
-        if is_image_line(line):
+        if kind == "image" and "](" in line:
             # Image line: no translation
             translated_lines.append(line)
             continue
 
         # Handle tables
-        if is_table_line(line):
-            if not in_table:
-                in_table = True
+        if "|" in line and kind != "comment":
             translated_lines.append(line)
             continue
-        else:
-            if in_table:
-                in_table = False
+
+        indent = m.group("indent")
+        stripped = line[len(indent):].rstrip()
 
         # Handle empty lines
-        if not line.strip():
+        if not stripped:
             translated_lines.append(line)
             continue
 
-        # Handle list items
-        if is_list_item(line):
-            marker, content = extract_list_marker(line)
-            if content.strip():
-                try:
-                    translated_content = translate_text(content, source=src_lang, target=dest_lang)
-                    translated_lines.append(f"{marker}{translated_content}")
-                    translated_count += 1
-                except TranslationError as exc:
-                    print(f"⚠ Line {line_num}: Translation failed, using original")
-                    translated_lines.append(line)
-                    failed_count += 1
+        # Handle list items, keeping the original indentation
+        if kind == "bullet":
+            content = stripped[1:].strip()
+            if content:
+                defer(f"{indent}{stripped[0]} ", content, line_num)
             else:
                 translated_lines.append(line)
             continue
+        if kind == "number":
+            defer(f"{indent}{m.group('number')} ", line[m.end():], line_num)
+            continue
 
         # Handle headings
-        if is_heading(line):
-            marker, content = extract_heading_marker(line)
-            if content.strip():
-                try:
-                    translated_content = translate_text(content, source=src_lang, target=dest_lang)
-                    translated_lines.append(f"{marker}{translated_content}")
-                    translated_count += 1
-                except TranslationError as exc:
-                    print(f"⚠ Line {line_num}: Translation failed, using original")
-                    translated_lines.append(line)
-                    failed_count += 1
-            else:
-                translated_lines.append(line)
+        if kind == "heading":
+            defer(f"{m.group('heading')} ", line[m.end():].rstrip(), line_num)
+            continue
+        if kind == "hash":
+            # "#" without a proper heading marker: translate the whole line
+            defer("", stripped, line_num)
             continue
 
-        # Regular text line: translate
-        if line.strip():
-            try:
-                translated_line = translate_text(line.strip(), source=src_lang, target=dest_lang)
-                # Preserve original indentation
-                indent = line[:len(line) - len(line.lstrip())]
-                translated_lines.append(f"{indent}{translated_line}")
-                translated_count += 1
-            except TranslationError as exc:
-                print(f"⚠ Line {line_num}: Translation failed, using original")
-                # Preserve original line on failure
-                translated_lines.append(line)
-                failed_count += 1
+        # Regular text line: translate, preserving original indentation
+        defer(indent, stripped, line_num)
+
+    # Distinct texts not already cached, in first-seen order
+    texts = list(dict.fromkeys(
+        content for _, _, content, _ in pending
+        if (src_lang, dest_lang, content) not in _cache
+    ))
+
+    print(f"\nTranslating {len(pending)} of {total_lines} lines "
+          f"({len(texts)} distinct uncached texts, {workers} workers) using Google Translate...")
+    print(f"Source: {src_lang} → Target: {dest_lang}")
+    print("=" * 70)
+
+    # Small enough batches that every worker gets a share
+    chunk = max(1, min(batch_size, -(-len(texts) // max(workers, 1))))
+    batches = [texts[i:i + chunk] for i in range(0, len(texts), chunk)]
+    limiter = RateLimiter(qps)
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = [
+            executor.submit(translate_batch_cached, batch, src_lang, dest_lang, cache_path, limiter)
+            for batch in batches
+        ]
+        for future in as_completed(futures):
+            done += len(future.result())
+            print(f"Progress: [{done}/{len(texts)}] {done / len(texts) * 100:.1f}%")
+
+    for index, marker, content, line_num in pending:
+        translated = _cache.get((src_lang, dest_lang, content))
+        if translated is None:
+            print(f"⚠ Line {line_num}: Translation failed, using original")
+            translated_lines[index] = lines[line_num - 1]
+            failed_count += 1
         else:
-            translated_lines.append(line)
+            translated_lines[index] = f"{marker}{translated}"
+            translated_count += 1
 
     print("=" * 70)
     print(f"✓ Translation complete!")
@@ -267,6 +323,18 @@ def main() -> None:
         default=DEFAULT_TARGET_LANGUAGE,
         help="Target language code (default: en for English)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"Concurrent translation requests (default: {MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--qps",
+        type=float,
+        default=MAX_QPS,
+        help=f"Max translation requests per second, 0 for no limit (default: {MAX_QPS:g})",
+    )
     args = parser.parse_args()
 
     if not args.input.exists():
@@ -287,8 +355,21 @@ def main() -> None:
 
     print(f"\nInput file: {len(source_text)} characters, {len(source_lines)} lines")
 
+    # Reuse translations from previous runs
+    cache_path = cache_path_for(args.output)
+    cached_count = load_cache(cache_path)
+    if cached_count:
+        print(f"Loaded {cached_count} cached translations from {cache_path.name}")
+
     # Translate line by line
-    translated_lines = translate_markdown_line_by_line(source_lines, args.source, args.target)
+    install_shared_session(max(args.workers, 16))
+    try:
+        translated_lines = translate_markdown_line_by_line(
+            source_lines, args.source, args.target, cache_path,
+            workers=args.workers, qps=args.qps,
+        )
+    finally:
+        save_cache(cache_path)
 
     # Write output
     result = "\n".join(translated_lines)
@@ -3,10 +3,13 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import queue
 import sys
+import threading
 import time
 from collections import defaultdict
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
@@ -17,6 +20,16 @@ except ModuleNotFoundError as exc:
         "Missing dependency 'requests'. Install it with 'pip install requests' and retry."
     ) from exc
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
 try:
     import chromadb
     from chromadb.api import ClientAPI
@@ -38,7 +51,9 @@ except ImportError:
 
 # Add parent directory to path for llm module import
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-from llm import get_embeddings, get_gloss, LLMServiceError
+from llm import get_embeddings, LLMServiceError
+from gloss_cache import GlossCache
+from ingest_utils import enable_fast_ingest, existing_ids, try_gloss
 
 
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -48,6 +63,10 @@ INDEX_DIR = OUTPUT_DIR / "vector_index"
 INDEX_DIR.mkdir(parents=True, exist_ok=True)
 
 DEFAULT_COLLECTION = os.environ.get("VECTOR_COLLECTION", "manual_chunks")
+DEFAULT_GLOSS_CACHE = OUTPUT_DIR / "gloss_cache.db"
+
+# orjson parses bytes directly and raises a json.JSONDecodeError subclass
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 
 @dataclass
@@ -69,41 +88,87 @@ class ChunkRecord:
     parent_title: Optional[str] = None
 
 
+JSONL_READ_SIZE = 1 << 16  # Bytes read per call when scanning JSONL files
+
+
+def iter_jsonl_lines(file_path: Path) -> Iterator[Tuple[int, bytes]]:
+    """Yield (line number, stripped line bytes) for each non-blank line.
+
+    Reads fixed-size binary blocks and scans them for newlines, so only the
+    JSON payload slices are ever materialized (no per-line text decoding).
+    """
+    line_number = 0
+    buf = b""
+    with file_path.open("rb") as handle:
+        while True:
+            block = handle.read(JSONL_READ_SIZE)
+            if not block:
+                break
+            # Only the unfinished tail of the previous block is carried over
+            buf = buf + block if buf else block
+            start = 0
+            while True:
+                newline = buf.find(b"\n", start)
+                if newline == -1:
+                    break
+                line_number += 1
+                line = buf[start:newline].strip()
+                start = newline + 1
+                if line:
+                    yield line_number, line
+            buf = buf[start:]
+    line = buf.strip()
+    if line:
+        yield line_number + 1, line
+
+
 def iter_chunk_records(chunk_dir: Path) -> Iterator[ChunkRecord]:
     if not chunk_dir.exists():
         raise SystemExit(f"Missing chunk directory: {chunk_dir}")
 
     for file_path in sorted(chunk_dir.glob("*.jsonl")):
-        with file_path.open("r", encoding="utf-8") as handle:
-            line_number = 0
-            for line in handle:
-                line_number += 1
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    payload = json.loads(line)
-                except json.JSONDecodeError as exc:
-                    raise SystemExit(
-                        f"Invalid JSON in {file_path}:{line_number}: {exc}"
-                    ) from exc
-
-                yield ChunkRecord(
-                    id=str(payload["id"]),
-                    text=str(payload["text"]),
-                    title=str(payload.get("title") or ""),
-                    section_index=int(payload.get("section_index", line_number - 1)),
-                    images=payload.get("images", []),
-                    source=payload.get("source", {}),
-                    gloss=payload.get("gloss"),
-                    chunk_type=payload.get("chunk_type"),
-                    heading_level=payload.get("heading_level"),
-                    heading_hierarchy=payload.get("heading_hierarchy"),
-                    section_title=payload.get("section_title"),
-                    token_count=payload.get("token_count"),
-                    has_children=payload.get("has_children"),
-                    parent_title=payload.get("parent_title"),
-                )
+        for line_number, line in iter_jsonl_lines(file_path):
+            try:
+                payload = _json_loads(line)
+            except json.JSONDecodeError as exc:
+                raise SystemExit(
+                    f"Invalid JSON in {file_path}:{line_number}: {exc}"
+                ) from exc
+
+            # Chunk files written by parse_md already carry the right types;
+            # only coerce values that don't
+            record_id = payload["id"]
+            text = payload["text"]
+            title = payload.get("title") or ""
+            section_index = payload.get("section_index", line_number - 1)
+            yield ChunkRecord(
+                id=record_id if isinstance(record_id, str) else str(record_id),
+                text=text if isinstance(text, str) else str(text),
+                title=title if isinstance(title, str) else str(title),
+                section_index=section_index if isinstance(section_index, int) else int(section_index),
+                images=payload.get("images", []),
+                source=payload.get("source", {}),
+                gloss=payload.get("gloss"),
+                chunk_type=payload.get("chunk_type"),
+                heading_level=payload.get("heading_level"),
+                heading_hierarchy=payload.get("heading_hierarchy"),
+                section_title=payload.get("section_title"),
+                token_count=payload.get("token_count"),
+                has_children=payload.get("has_children"),
+                parent_title=payload.get("parent_title"),
+            )
+
+
+def count_chunk_records(chunk_dir: Path) -> int:
+    """Count the records iter_chunk_records will yield, without parsing JSON."""
+    if not chunk_dir.exists():
+        raise SystemExit(f"Missing chunk directory: {chunk_dir}")
+
+    return sum(
+        1
+        for file_path in chunk_dir.glob("*.jsonl")
+        for _ in iter_jsonl_lines(file_path)
+    )
 
 
 def batched(iterable: Iterable[ChunkRecord], size: int) -> Iterator[List[ChunkRecord]]:
@@ -129,6 +194,17 @@ def ensure_collection(client: ClientAPI, name: str, reset: bool) -> Collection:
     return client.get_or_create_collection(name=name)
 
 
+# "source_<key>" metadata keys, built and interned once per distinct source key
+_SOURCE_KEYS: Dict[str, str] = {}
+
+
+def _source_key(key: str) -> str:
+    prefixed = _SOURCE_KEYS.get(key)
+    if prefixed is None:
+        prefixed = _SOURCE_KEYS[key] = sys.intern(f"source_{key}")
+    return prefixed
+
+
 def format_metadata(record: ChunkRecord) -> Dict[str, object]:
     metadata: Dict[str, object] = {
         "title": record.title,
@@ -157,107 +233,360 @@ def format_metadata(record: ChunkRecord) -> Dict[str, object]:
         metadata["parent_title"] = record.parent_title
 
     for key, value in record.source.items():
-        metadata[f"source_{key}"] = str(value)
+        metadata[_source_key(key)] = value if isinstance(value, str) else str(value)
     return metadata
 
 
+@dataclass
+class PipelineBatch:
+    """One batch of records moving through the gloss -> embed -> upsert stages."""
+    index: int
+    records: List[ChunkRecord]
+    started: float
+    ids: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, object]] = field(default_factory=list)
+    embeddings: Optional[List[List[float]]] = None
+
+
+# Batches waiting between two stages; bounds memory to ~PIPELINE_DEPTH batches
+PIPELINE_DEPTH = 2
+
+
+def _drain(in_q: "queue.Queue[Optional[PipelineBatch]]") -> None:
+    """Consume an input queue until its sentinel so the upstream stage can exit."""
+    while in_q.get() is not None:
+        pass
+
+
+def _stage_gloss(
+    batches: Iterable[List[ChunkRecord]],
+    out_q: "queue.Queue[Optional[PipelineBatch]]",
+    stop: threading.Event,
+    errors: List[BaseException],
+    concurrency: int,
+    total_batches: int,
+    gloss_cache: Optional[GlossCache],
+    counts: Dict[str, int],
+    skip_existing_in: Optional[Collection] = None,
+    verbose: bool = False,
+    progress_bar: Optional[tqdm] = None,
+) -> None:
+    """Generate missing glosses and build the augmented texts for each batch.
+
+    With skip_existing_in, records whose ids are already in that collection
+    are dropped before any gloss or embedding work is done for them; they
+    are tallied in counts["skipped"] and advance progress_bar right away.
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as gloss_pool:
+            for batch_idx, records in enumerate(batches, 1):
+                if stop.is_set():
+                    break
+
+                if verbose:
+                    progress = (batch_idx / total_batches) * 100
+                    print(f"\n[Batch {batch_idx}/{total_batches}] {progress:.1f}% | Processing {len(records)} chunks...")
+
+                if skip_existing_in is not None:
+                    stored = existing_ids(skip_existing_in, [record.id for record in records])
+                    if stored:
+                        records = [record for record in records if record.id not in stored]
+                        counts["skipped"] += len(stored)
+                        if progress_bar is not None:
+                            progress_bar.update(len(stored))
+                        if verbose:
+                            print(f"  └─ {len(stored)} chunks already indexed, skipped")
+                    if not records:
+                        continue
+                batch = PipelineBatch(index=batch_idx, records=records, started=time.time())
+
+                gloss_count = 0
+                missing = [record for record in records if not record.gloss]
+                if missing and gloss_cache is not None:
+                    cached = gloss_cache.get_many([record.text for record in missing])
+                    if cached:
+                        for record in missing:
+                            record.gloss = cached.get(record.text)
+                        missing = [record for record in missing if not record.gloss]
+                        if verbose:
+                            print(f"  └─ {len(cached)} glosses from cache")
+                if missing:
+                    if verbose:
+                        print(f"  └─ Generating {len(missing)} glosses ({concurrency} concurrent)...")
+                    results = gloss_pool.map(try_gloss, [record.text for record in missing])
+                    for record, result in zip(missing, results):
+                        if isinstance(result, Exception):
+                            print(f"  └─ Warning: Gloss generation failed for {record.title[:50]}: {result}")
+                            record.gloss = None
+                        else:
+                            record.gloss = result
+                            gloss_count += 1
+                    if gloss_cache is not None:
+                        gloss_cache.put_many(
+                            (record.text, record.gloss) for record in missing if record.gloss
+                        )
+
+                # Build everything the upsert needs in this one pass over the records
+                for record in records:
+                    augmented = record.text
+                    if record.gloss:
+                        augmented = f"{augmented.strip()}\n\nOne-line gloss: {record.gloss.strip()}"
+                    batch.ids.append(record.id)
+                    batch.texts.append(augmented)
+                    batch.metadatas.append(format_metadata(record))
+
+                if verbose and gloss_count > 0:
+                    print(f"  ✓ [Batch {batch_idx}] Generated {gloss_count} new glosses")
+
+                out_q.put(batch)
+    except BaseException as exc:
+        errors.append(exc)
+        stop.set()
+    finally:
+        out_q.put(None)
+
+
+def _stage_embed(
+    in_q: "queue.Queue[Optional[PipelineBatch]]",
+    out_q: "queue.Queue[Optional[PipelineBatch]]",
+    stop: threading.Event,
+    errors: List[BaseException],
+    pause: float,
+    verbose: bool = False,
+) -> None:
+    """Embed each batch's texts, retrying transient failures with backoff."""
+    try:
+        while True:
+            batch = in_q.get()
+            if batch is None:
+                return
+            if stop.is_set():
+                continue
+
+            if verbose:
+                print(f"  → Generating embeddings for batch {batch.index}...")
+            attempts = 0
+            while True:
+                attempts += 1
+                try:
+                    batch.embeddings = get_embeddings(batch.texts)
+                    if verbose:
+                        print(f"  ✓ [Batch {batch.index}] Embeddings generated (dimension: {len(batch.embeddings[0])})")
+                    break
+                except LLMServiceError as exc:
+                    if attempts >= 3:
+                        print(f"  ✗ Failed after {attempts} attempts")
+                        raise
+                    print(f"  ⚠ Attempt {attempts} failed, retrying in {pause * attempts}s...")
+                    time.sleep(pause * attempts)
+                except requests.RequestException as exc:
+                    if attempts >= 3:
+                        print(f"  ✗ Failed after {attempts} attempts")
+                        raise RuntimeError(
+                            f"Failed to contact embedding service after retries: {exc}"
+                        ) from exc
+                    print(f"  ⚠ Attempt {attempts} failed, retrying in {pause * attempts}s...")
+                    time.sleep(pause * attempts)
+
+            out_q.put(batch)
+    except BaseException as exc:
+        errors.append(exc)
+        stop.set()
+        _drain(in_q)
+    finally:
+        out_q.put(None)
+
+
+def _stage_upsert(
+    in_q: "queue.Queue[Optional[PipelineBatch]]",
+    collection: Collection,
+    stop: threading.Event,
+    errors: List[BaseException],
+    counts: Dict[str, int],
+    total_records: int,
+    start_time: float,
+    upsert_batch: int,
+    fast_ingest: bool,
+    add_only: bool,
+    verbose: bool = False,
+    progress_bar: Optional[tqdm] = None,
+) -> None:
+    """Store embedded batches in ChromaDB and report progress.
+
+    Batches are accumulated and written `upsert_batch` records at a time, so
+    Chroma commits far fewer (larger) transactions than there are embedding
+    requests. add_only writes with `add`, which skips upsert's existence
+    check and is only safe when none of the ids are stored yet. Progress goes
+    to progress_bar when given, otherwise one line is printed per write.
+    Written records are tallied in counts["written"].
+    """
+    write = collection.add if add_only else collection.upsert
+    pending_ids: List[str] = []
+    pending_embeddings: List[List[float]] = []
+    pending_docs: List[str] = []
+    pending_metas: List[Dict[str, object]] = []
+
+    def flush() -> None:
+        if not pending_ids:
+            return
+        if verbose:
+            print(f"  → Storing {len(pending_ids)} chunks in ChromaDB...")
+        write(
+            ids=pending_ids,
+            embeddings=pending_embeddings,
+            documents=pending_docs,
+            metadatas=pending_metas,
+        )
+        counts["written"] += len(pending_ids)
+        if progress_bar is not None:
+            progress_bar.update(len(pending_ids))
+        pending_ids.clear()
+        pending_embeddings.clear()
+        pending_docs.clear()
+        pending_metas.clear()
+        if progress_bar is not None:
+            return
+
+        # Skipped records cost next to nothing, so only written ones set the pace
+        written, skipped = counts["written"], counts["skipped"]
+        elapsed = time.time() - start_time
+        remaining = max(total_records - written - skipped, 0)
+        eta = remaining * elapsed / written
+        print(f"  📊 Progress: {written + skipped}/{total_records} chunks | Elapsed: {elapsed:.1f}s | ETA: {eta:.1f}s")
+
+    try:
+        if fast_ingest and enable_fast_ingest(collection):
+            print("⚠ --fast-ingest: SQLite journaling and fsync are off; if this run crashes, rebuild the index with --reset")
+        while True:
+            batch = in_q.get()
+            if batch is None:
+                if not stop.is_set():
+                    flush()
+                return
+            if stop.is_set():
+                continue
+
+            pending_ids.extend(batch.ids)
+            pending_embeddings.extend(batch.embeddings)
+            pending_docs.extend(batch.texts)
+            pending_metas.extend(batch.metadatas)
+
+            if verbose:
+                batch_time = time.time() - batch.started
+                print(f"  ✓ Batch {batch.index} complete in {batch_time:.1f}s")
+            if len(pending_ids) >= upsert_batch:
+                flush()
+    except BaseException as exc:
+        errors.append(exc)
+        stop.set()
+        _drain(in_q)
+
+
 def process_chunks(
     collection: Collection,
     records: Iterable[ChunkRecord],
     batch_size: int,
     pause: float,
+    concurrency: int = 8,
+    gloss_cache: Optional[GlossCache] = None,
+    upsert_batch: int = 200,
+    fast_ingest: bool = False,
+    total_records: Optional[int] = None,
+    resume: bool = False,
+    verbose: bool = False,
 ) -> None:
-    """Process chunks with progress indicator."""
-    # Convert to list to get total count
-    records_list = list(records)
-    total_records = len(records_list)
+    """Process chunks with progress indicator.
+
+    Batches flow through three threads connected by bounded queues, so batch
+    N+1's glosses overlap batch N's embeddings and batch N-1's upsert. Missing
+    glosses within a batch are generated concurrently (up to `concurrency`
+    requests in flight); with a gloss_cache, previously generated glosses
+    are reused instead. Embeddings are requested `batch_size` at a time but
+    written to Chroma `upsert_batch` at a time. fast_ingest trades crash
+    safety for write speed (see FAST_INGEST_PRAGMAS).
+
+    records are streamed through the pipeline; pass total_records (e.g. from
+    count_chunk_records) for progress reporting, otherwise they are
+    materialized once to count them.
+
+    Records are written with `add` into an empty collection and with `upsert`
+    otherwise. resume skips records whose ids are already indexed (e.g. after
+    an interrupted run) and adds only the rest.
+
+    Progress is a tqdm bar when tqdm is installed; verbose prints per-batch
+    detail instead.
+    """
+    if total_records is None:
+        records = list(records)
+        total_records = len(records)
     total_batches = (total_records + batch_size - 1) // batch_size
-    processed = 0
+
+    add_only = resume or collection.count() == 0
 
     print(f"\nProcessing {total_records} chunks in {total_batches} batches...")
-    print(f"Batch size: {batch_size}")
+    print(f"Batch size: {batch_size} (upsert batch: {upsert_batch})")
     print("=" * 70)
 
-    start_time = time.time()
-
-    for batch_idx, batch in enumerate(batched(records_list, batch_size), 1):
-        batch_start = time.time()
-
-        # Show progress
-        progress = (batch_idx / total_batches) * 100
-        print(f"\n[Batch {batch_idx}/{total_batches}] {progress:.1f}% | Processing {len(batch)} chunks...")
-
-        texts: List[str] = []
-        gloss_count = 0
-
-        for idx, record in enumerate(batch, 1):
-            if not record.gloss:
-                try:
-                    print(f"  └─ Generating gloss for chunk {idx}/{len(batch)}: {record.title[:50]}...")
-                    record.gloss = get_gloss(record.text)
-                    gloss_count += 1
-                except Exception as exc:
-                    print(f"  └─ Warning: Gloss generation failed: {exc}")
-                    record.gloss = None
-
-            augmented = record.text
-            if record.gloss:
-                augmented = f"{augmented.strip()}\n\nOne-line gloss: {record.gloss.strip()}"
-            texts.append(augmented)
-
-        if gloss_count > 0:
-            print(f"  ✓ Generated {gloss_count} new glosses")
-
-        # Embed with retry logic
-        print(f"  → Generating embeddings for batch {batch_idx}...")
-        attempts = 0
-        while True:
-            attempts += 1
-            try:
-                embeddings = get_embeddings(texts)
-                print(f"  ✓ Embeddings generated (dimension: {len(embeddings[0])})")
-                break
-            except LLMServiceError as exc:
-                if attempts >= 3:
-                    print(f"  ✗ Failed after {attempts} attempts")
-                    raise
-                print(f"  ⚠ Attempt {attempts} failed, retrying in {pause * attempts}s...")
-                time.sleep(pause * attempts)
-            except requests.RequestException as exc:
-                if attempts >= 3:
-                    print(f"  ✗ Failed after {attempts} attempts")
-                    raise RuntimeError(
-                        f"Failed to contact embedding service after retries: {exc}"
-                    ) from exc
-                print(f"  ⚠ Attempt {attempts} failed, retrying in {pause * attempts}s...")
-                time.sleep(pause * attempts)
-
-        # Store in vector DB
-        print(f"  → Storing {len(batch)} chunks in ChromaDB...")
-        ids = [record.id for record in batch]
-        metadatas = [format_metadata(record) for record in batch]
-        collection.upsert(
-            ids=ids,
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas,
-        )
-
-        processed += len(batch)
-        batch_time = time.time() - batch_start
-        elapsed = time.time() - start_time
-        avg_time_per_batch = elapsed / batch_idx
-        remaining_batches = total_batches - batch_idx
-        eta = remaining_batches * avg_time_per_batch
+    progress_bar = None
+    if tqdm is not None and not verbose:
+        progress_bar = tqdm(total=total_records, unit="chunk")
 
-        print(f"  ✓ Batch {batch_idx} complete in {batch_time:.1f}s")
-        print(f"  📊 Progress: {processed}/{total_records} chunks | Elapsed: {elapsed:.1f}s | ETA: {eta:.1f}s")
+    start_time = time.time()
+    embed_q: "queue.Queue[Optional[PipelineBatch]]" = queue.Queue(maxsize=PIPELINE_DEPTH)
+    upsert_q: "queue.Queue[Optional[PipelineBatch]]" = queue.Queue(maxsize=PIPELINE_DEPTH)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    counts = {"written": 0, "skipped": 0}
+
+    stages = [
+        threading.Thread(
+            target=_stage_gloss,
+            args=(
+                batched(records, batch_size), embed_q, stop, errors,
+                concurrency, total_batches, gloss_cache, counts,
+                collection if resume else None, verbose, progress_bar,
+            ),
+            name="gloss",
+            daemon=True,
+        ),
+        threading.Thread(
+            target=_stage_embed,
+            args=(embed_q, upsert_q, stop, errors, pause, verbose),
+            name="embed",
+            daemon=True,
+        ),
+        threading.Thread(
+            target=_stage_upsert,
+            args=(
+                upsert_q, collection, stop, errors, counts,
+                total_records, start_time, upsert_batch, fast_ingest,
+                add_only, verbose, progress_bar,
+            ),
+            name="upsert",
+            daemon=True,
+        ),
+    ]
+    for stage in stages:
+        stage.start()
+    for stage in stages:
+        stage.join()
+    if progress_bar is not None:
+        progress_bar.close()
+
+    if errors:
+        raise errors[0]
 
     total_time = time.time() - start_time
+    written, skipped = counts["written"], counts["skipped"]
     print("\n" + "=" * 70)
-    print(f"✓ All {total_records} chunks processed successfully!")
+    if skipped:
+        print(f"✓ {written} chunks written, {skipped} already indexed and skipped")
+    else:
+        print(f"✓ All {written} chunks processed successfully!")
     print(f"  Total time: {total_time:.1f}s ({total_time/60:.1f} minutes)")
-    print(f"  Average: {total_time/total_records:.2f}s per chunk")
+    if written:
+        print(f"  Average: {total_time/written:.2f}s per written chunk")
     print("=" * 70)
 
 
@@ -285,20 +614,58 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=8,
+        default=96,
         help="Number of chunks to embed per request (embeddings endpoint).",
     )
+    parser.add_argument(
+        "--upsert-batch",
+        type=int,
+        default=200,
+        help="Number of chunks written to Chroma per upsert.",
+    )
     parser.add_argument(
         "--reset",
         action="store_true",
         help="Drop existing collection before inserting.",
     )
+    parser.add_argument(
+        "--fast-ingest",
+        action="store_true",
+        help="Disable SQLite journaling/fsync while writing (unsafe if the run crashes).",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print per-batch gloss/embedding/storage detail instead of a progress bar.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip chunks whose ids are already indexed and add only the rest.",
+    )
     parser.add_argument(
         "--pause",
         type=float,
         default=2.0,
         help="Base pause (seconds) between retry attempts.",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Max gloss requests in flight at once.",
+    )
+    parser.add_argument(
+        "--gloss-cache",
+        type=Path,
+        default=DEFAULT_GLOSS_CACHE,
+        help="SQLite file caching glosses across runs.",
+    )
+    parser.add_argument(
+        "--no-gloss-cache",
+        action="store_true",
+        help="Always regenerate glosses (don't read or write the gloss cache).",
+    )
     return parser.parse_args()
 
 
@@ -311,8 +678,26 @@ def main() -> None:
     client = chromadb.PersistentClient(path=str(args.index_dir))
     collection = ensure_collection(client, args.collection, reset=args.reset)
 
+    gloss_cache = None if args.no_gloss_cache else GlossCache(args.gloss_cache)
+    total_records = count_chunk_records(args.chunk_dir)
     records = iter_chunk_records(args.chunk_dir)
-    process_chunks(collection, records, batch_size=args.batch_size, pause=args.pause)
+    try:
+        process_chunks(
+            collection,
+            records,
+            batch_size=args.batch_size,
+            pause=args.pause,
+            concurrency=args.concurrency,
+            gloss_cache=gloss_cache,
+            upsert_batch=args.upsert_batch,
+            fast_ingest=args.fast_ingest,
+            total_records=total_records,
+            resume=args.resume,
+            verbose=args.verbose,
+        )
+    finally:
+        if gloss_cache is not None:
+            gloss_cache.close()
 
 
 if __name__ == "__main__":
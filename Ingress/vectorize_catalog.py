@@ -22,8 +22,9 @@ import os
 import re
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 
 # Load environment variables
 try:
@@ -35,6 +36,16 @@ try:
 except ImportError:
     pass
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
 try:
     import chromadb
     from chromadb.api import ClientAPI
@@ -47,7 +58,9 @@ except ModuleNotFoundError as exc:
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from catalog import CatalogBuilder
-from llm import get_embeddings, get_gloss, LLMServiceError
+from llm import get_embeddings, LLMServiceError
+from gloss_cache import GlossCache
+from ingest_utils import enable_fast_ingest, existing_ids, try_gloss
 
 
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -56,6 +69,10 @@ INDEX_DIR = BASE_DIR / "output" / "vector_index"
 INDEX_DIR.mkdir(parents=True, exist_ok=True)
 
 DEFAULT_COLLECTION = os.environ.get("VECTOR_COLLECTION", "manual_chunks")
+DEFAULT_GLOSS_CACHE = BASE_DIR / "output" / "gloss_cache.db"
+
+_META_RE = re.compile(r'<!--\s*METADATA\s*\n.*?\n\s*-->\s*\n?', re.DOTALL | re.IGNORECASE)
+_PARA_RE = re.compile(r'\n\n+')
 
 
 class ArticleChunker:
@@ -103,43 +120,30 @@ class ArticleChunker:
         # Split by paragraphs
         paragraphs = self._split_paragraphs(content_no_meta)
 
-        # Group paragraphs into chunks
-        chunks = []
-        current_chunk = []
-        current_size = 0
-
-        for para in paragraphs:
-            para_size = len(para)
-
-            # Skip tiny paragraphs
-            if para_size < 20:
-                continue
+        # Skip tiny paragraphs; keep lengths alongside so grouping never rejoins
+        paragraphs = [p for p in paragraphs if len(p) >= 20]
+        lengths = [len(p) for p in paragraphs]
 
-            # If adding this paragraph exceeds max size, save current chunk
-            if current_size + para_size > self.max_chunk_size and current_chunk:
-                chunk_text = '\n\n'.join(current_chunk)
-                if len(chunk_text) >= self.min_chunk_size:
-                    chunks.append({
-                        'text': chunk_text,
-                        'chunk_index': len(chunks),
-                        'is_whole_article': False
-                    })
-                current_chunk = []
-                current_size = 0
-
-            # Add paragraph to current chunk
-            current_chunk.append(para)
-            current_size += para_size
-
-        # Save last chunk
-        if current_chunk:
-            chunk_text = '\n\n'.join(current_chunk)
-            if len(chunk_text) >= self.min_chunk_size:
+        # Group consecutive paragraphs into chunks of at most max_chunk_size
+        # (separators not counted); a chunk always takes at least one paragraph
+        chunks = []
+        count = len(paragraphs)
+        start = 0
+        while start < count:
+            end = start + 1
+            size = lengths[start]
+            while end < count and size + lengths[end] <= self.max_chunk_size:
+                size += lengths[end]
+                end += 1
+
+            # Joined length is the paragraph total plus the '\n\n' separators
+            if size + 2 * (end - start - 1) >= self.min_chunk_size:
                 chunks.append({
-                    'text': chunk_text,
+                    'text': '\n\n'.join(paragraphs[start:end]),
                     'chunk_index': len(chunks),
                     'is_whole_article': False
                 })
+            start = end
 
         return chunks if chunks else [{
             'text': content_no_meta,
@@ -149,26 +153,23 @@ class ArticleChunker:
 
     def _remove_metadata_block(self, content: str) -> str:
         """Remove metadata block from content."""
-        pattern = r'<!--\s*METADATA\s*\n.*?\n\s*-->\s*\n?'
-        return re.sub(pattern, '', content, count=1, flags=re.DOTALL | re.IGNORECASE)
+        return _META_RE.sub('', content, count=1)
 
     def _split_paragraphs(self, content: str) -> List[str]:
         """Split content into paragraphs."""
         # Split by double newline (paragraph separator)
-        paragraphs = re.split(r'\n\n+', content)
+        paragraphs = _PARA_RE.split(content)
         return [p.strip() for p in paragraphs if p.strip()]
 
 
-def build_chunk_metadata(article: Dict, chunk_index: int, total_chunks: int) -> Dict:
-    """Build metadata for a chunk.
+def build_article_metadata(article: Dict) -> Dict:
+    """Build the metadata shared by every chunk of an article.
 
     Args:
         article: Article data from catalog
-        chunk_index: Index of this chunk
-        total_chunks: Total number of chunks for this article
 
     Returns:
-        Metadata dictionary for ChromaDB
+        Metadata dictionary without the per-chunk fields
     """
     metadata = {
         # Article identification
@@ -179,10 +180,6 @@ def build_chunk_metadata(article: Dict, chunk_index: int, total_chunks: int) ->
         "intent": article['intent'],
         "category": article['category'],
 
-        # Chunk info
-        "chunk_index": chunk_index,
-        "total_chunks": total_chunks,
-
         # Relationships
         "parent_id": article.get('parent_id') or "",
         "has_children": len(article.get('children_ids', [])) > 0,
@@ -204,19 +201,119 @@ def build_chunk_metadata(article: Dict, chunk_index: int, total_chunks: int) ->
     return metadata
 
 
+def build_chunk_metadata(article_metadata: Dict, chunk_index: int, total_chunks: int) -> Dict:
+    """Build metadata for a chunk.
+
+    Args:
+        article_metadata: Shared article fields from build_article_metadata
+        chunk_index: Index of this chunk
+        total_chunks: Total number of chunks for this article
+
+    Returns:
+        Metadata dictionary for ChromaDB
+    """
+    return {
+        **article_metadata,
+        "chunk_index": chunk_index,
+        "total_chunks": total_chunks,
+    }
+
+
+def try_embed(texts: List[str], pause: float) -> Union[List[List[float]], Exception]:
+    """Embed one batch, returning the exception instead of raising it.
+
+    Sleeps `pause` afterwards so each concurrent slot is rate limited.
+    """
+    try:
+        return get_embeddings(texts)
+    except Exception as exc:
+        return exc
+    finally:
+        if pause:
+            time.sleep(pause)
+
+
+# Per-process catalog builder and chunker used by _chunk_one_article
+_chunk_worker: Optional[Tuple[CatalogBuilder, ArticleChunker]] = None
+
+
+def _init_chunk_worker(catalog_dir: Path) -> None:
+    """Set up the catalog builder and chunker for this (worker) process."""
+    global _chunk_worker
+    _chunk_worker = (CatalogBuilder(catalog_dir), ArticleChunker())
+
+
+def _chunk_one_article(
+    article_id: str,
+) -> Tuple[str, Union[List[Tuple[str, str, Dict]], Exception]]:
+    """Load and chunk one article into (chunk id, text, metadata) entries.
+
+    Runs in worker processes, so failures are returned rather than raised.
+    """
+    catalog_builder, chunker = _chunk_worker
+    try:
+        article = catalog_builder.get_article(article_id)
+        chunks = chunker.chunk_article(article)
+        article_metadata = build_article_metadata(article)
+        return article_id, [
+            (
+                f"{article_id}__chunk_{chunk_data['chunk_index']}",
+                chunk_data['text'],
+                build_chunk_metadata(article_metadata, chunk_data['chunk_index'], len(chunks)),
+            )
+            for chunk_data in chunks
+        ]
+    except Exception as exc:
+        return article_id, exc
+
+
+def load_article_ids(catalog_builder: CatalogBuilder) -> List[str]:
+    """List article ids in catalog.json order.
+
+    With ijson only the keys of the "articles" object are streamed out, so the
+    per-article metadata is never materialized; article content is loaded later
+    one article at a time via get_article. Without ijson the builder's parsed
+    catalog index is used.
+    """
+    if ijson is None:
+        return list(catalog_builder.catalog['articles'])
+
+    article_ids = []
+    with open(catalog_builder.catalog_file, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if event == 'map_key' and prefix == 'articles':
+                article_ids.append(value)
+    return article_ids
+
+
 def vectorize_catalog(
     catalog_builder: CatalogBuilder,
     collection: Collection,
-    batch_size: int = 8,
-    pause: float = 0.1
+    batch_size: int = 96,
+    pause: float = 0.1,
+    concurrency: int = 8,
+    gloss_cache: Optional[GlossCache] = None,
+    upsert_batch: int = 200,
+    workers: Optional[int] = None,
+    resume: bool = False,
+    verbose: bool = False,
 ) -> Dict:
     """Vectorize all articles from catalog.
 
     Args:
         catalog_builder: CatalogBuilder instance
         collection: ChromaDB collection
-        batch_size: Number of chunks to process per batch
+        batch_size: Number of chunks to embed per request
         pause: Pause between batches (seconds)
+        concurrency: Max gloss and embedding requests in flight at once
+        gloss_cache: Optional persistent cache of previously generated glosses
+        upsert_batch: Number of chunks written to ChromaDB per upsert
+        workers: Processes loading and chunking articles (default: CPU count)
+        resume: Skip chunks whose ids are already indexed and add only the rest
+        verbose: Print per-batch detail instead of tqdm progress bars
+
+    Chunks are written with `add` into an empty collection (or when resuming)
+    and with `upsert` otherwise.
 
     Returns:
         Statistics dictionary
@@ -226,16 +323,12 @@ def vectorize_catalog(
     if not catalog_file.exists():
         raise FileNotFoundError(f"Catalog not found: {catalog_file}")
 
-    import json
-    catalog_data = json.loads(catalog_file.read_text(encoding='utf-8'))
-    article_ids = list(catalog_data['articles'].keys())
+    article_ids = load_article_ids(catalog_builder)
 
     print(f"\n{'='*70}")
     print(f"Vectorizing {len(article_ids)} articles from catalog")
     print(f"{'='*70}\n")
 
-    chunker = ArticleChunker()
-
     total_chunks = 0
     processed_articles = 0
     failed_articles = 0
@@ -244,101 +337,164 @@ def vectorize_catalog(
     all_chunks = []
     all_ids = []
     all_metadatas = []
-    all_glosses = []
+    all_glosses: List[Optional[str]] = []
 
     start_time = time.time()
 
-    for idx, article_id in enumerate(article_ids, 1):
-        try:
-            # Load article
-            article = catalog_builder.get_article(article_id)
-
-            # Chunk article
-            chunks = chunker.chunk_article(article)
-
-            # Process each chunk
-            for chunk_data in chunks:
-                chunk_id = f"{article_id}__chunk_{chunk_data['chunk_index']}"
-                chunk_text = chunk_data['text']
-
-                # Build metadata
-                metadata = build_chunk_metadata(
-                    article,
-                    chunk_data['chunk_index'],
-                    len(chunks)
-                )
-
-                # Generate gloss (summary)
-                try:
-                    gloss = get_gloss(chunk_text)
-                except Exception as e:
-                    print(f"  ⚠ Gloss generation failed for {chunk_id}: {e}")
-                    gloss = None
-
-                # Augment text with gloss
-                augmented_text = chunk_text
-                if gloss:
-                    augmented_text = f"{chunk_text.strip()}\n\nSummary: {gloss.strip()}"
-                    metadata["gloss"] = gloss
-
-                all_chunks.append(augmented_text)
+    # Load and chunk articles across processes; results arrive in article order
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    if workers > 1 and len(article_ids) > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_chunk_worker,
+            initargs=(catalog_builder.catalog_dir,),
+        )
+        results_iter = pool.map(_chunk_one_article, article_ids, chunksize=16)
+    else:
+        _init_chunk_worker(catalog_builder.catalog_dir)
+        results_iter = map(_chunk_one_article, article_ids)
+
+    # A progress bar (tqdm installed, not verbose) replaces the periodic lines
+    show_bars = tqdm is not None and not verbose
+    if show_bars:
+        results_iter = tqdm(results_iter, total=len(article_ids), unit="article", desc="Chunking")
+
+    try:
+        for idx, (article_id, entries) in enumerate(results_iter, 1):
+            if isinstance(entries, Exception):
+                print(f"  ✗ Failed to process article '{article_id}': {entries}")
+                failed_articles += 1
+                continue
+
+            # Collect each chunk; glosses are generated for all of them below
+            for chunk_id, text, metadata in entries:
+                all_chunks.append(text)
                 all_ids.append(chunk_id)
                 all_metadatas.append(metadata)
-                all_glosses.append(gloss)
                 total_chunks += 1
 
             processed_articles += 1
 
             # Progress update
-            if idx % 5 == 0 or idx == len(article_ids):
+            if not show_bars and (idx % 5 == 0 or idx == len(article_ids)):
                 progress = (idx / len(article_ids)) * 100
                 elapsed = time.time() - start_time
                 print(f"Progress: [{idx}/{len(article_ids)}] {progress:.1f}% | "
                       f"Articles: {processed_articles} | Chunks: {total_chunks} | "
                       f"Elapsed: {elapsed:.1f}s")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if resume:
+        stored = existing_ids(collection, all_ids)
+        if stored:
+            keep = [i for i, chunk_id in enumerate(all_ids) if chunk_id not in stored]
+            all_chunks = [all_chunks[i] for i in keep]
+            all_ids = [all_ids[i] for i in keep]
+            all_metadatas = [all_metadatas[i] for i in keep]
+            print(f"\n{len(stored)} chunks already indexed, skipped")
+    embed_count = len(all_chunks)
+
+    # Generate glosses (summaries) concurrently: each is an independent LLM call
+    cached = gloss_cache.get_many(all_chunks) if gloss_cache is not None else {}
+    todo = [i for i, text in enumerate(all_chunks) if text not in cached]
+    print(f"\nGenerating glosses for {len(todo)} chunks ({concurrency} concurrent, "
+          f"{embed_count - len(todo)} cached)...")
+    results: List[Union[str, Exception]] = [cached.get(text, "") for text in all_chunks]
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        for i, result in zip(todo, pool.map(try_gloss, [all_chunks[i] for i in todo])):
+            results[i] = result
+    if gloss_cache is not None:
+        gloss_cache.put_many(
+            (all_chunks[i], results[i]) for i in todo
+            if results[i] and not isinstance(results[i], Exception)
+        )
 
-        except Exception as e:
-            print(f"  ✗ Failed to process article '{article_id}': {e}")
-            failed_articles += 1
+    for i, result in enumerate(results):
+        gloss = None
+        if isinstance(result, Exception):
+            print(f"  ⚠ Gloss generation failed for {all_ids[i]}: {result}")
+        else:
+            gloss = result
+
+        # Augment text with gloss
+        if gloss:
+            all_chunks[i] = f"{all_chunks[i].strip()}\n\nSummary: {gloss.strip()}"
+            all_metadatas[i]["gloss"] = gloss
+        all_glosses.append(gloss)
 
     # Now vectorize all chunks in batches
     print(f"\n{'='*70}")
-    print(f"Generating embeddings for {total_chunks} chunks...")
+    print(f"Generating embeddings for {embed_count} chunks...")
     print(f"{'='*70}\n")
 
-    batch_count = (total_chunks + batch_size - 1) // batch_size
-
-    for batch_idx in range(0, total_chunks, batch_size):
-        batch_end = min(batch_idx + batch_size, total_chunks)
-        batch_texts = all_chunks[batch_idx:batch_end]
-        batch_ids = all_ids[batch_idx:batch_end]
-        batch_metas = all_metadatas[batch_idx:batch_end]
+    batch_count = (embed_count + batch_size - 1) // batch_size
 
-        batch_num = (batch_idx // batch_size) + 1
-        progress = (batch_num / batch_count) * 100
-        print(f"Batch {batch_num}/{batch_count} ({progress:.1f}%): "
-              f"Embedding {len(batch_texts)} chunks...")
+    # Embedded chunks waiting to be written; stored upsert_batch at a time.
+    # add skips upsert's existence check, so use it when no id can be stored yet
+    write = collection.add if resume or collection.count() == 0 else collection.upsert
+    pending_ids: List[str] = []
+    pending_embeddings: List[List[float]] = []
+    pending_texts: List[str] = []
+    pending_metas: List[Dict] = []
 
+    def flush() -> None:
+        if not pending_ids:
+            return
         try:
-            # Generate embeddings
-            embeddings = get_embeddings(batch_texts)
-
-            # Store in ChromaDB
-            collection.upsert(
-                ids=batch_ids,
-                embeddings=embeddings,
-                documents=batch_texts,
-                metadatas=batch_metas
+            write(
+                ids=pending_ids,
+                embeddings=pending_embeddings,
+                documents=pending_texts,
+                metadatas=pending_metas
             )
-
-            print(f"  ✓ Stored {len(batch_texts)} chunks")
-
-            # Pause to avoid rate limiting
-            if batch_idx + batch_size < total_chunks:
-                time.sleep(pause)
-
+            if not show_bars:
+                print(f"  ✓ Stored {len(pending_ids)} chunks")
         except Exception as e:
-            print(f"  ✗ Batch {batch_num} failed: {e}")
+            print(f"  ✗ Storing {len(pending_ids)} chunks failed: {e}")
+        pending_ids.clear()
+        pending_embeddings.clear()
+        pending_texts.clear()
+        pending_metas.clear()
+
+    # Embedding batches are independent requests: keep up to `concurrency` in
+    # flight and store results in batch order as they come back
+    batch_starts = range(0, embed_count, batch_size)
+    print(f"Embedding {batch_count} batches ({concurrency} concurrent)...")
+    progress_bar = tqdm(total=embed_count, unit="chunk", desc="Embedding") if show_bars else None
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        batch_results = pool.map(
+            lambda start: try_embed(all_chunks[start:start + batch_size], pause),
+            batch_starts,
+        )
+        for batch_idx, embeddings in zip(batch_starts, batch_results):
+            batch_end = min(batch_idx + batch_size, embed_count)
+            batch_num = (batch_idx // batch_size) + 1
+            progress = (batch_num / batch_count) * 100
+
+            if isinstance(embeddings, Exception):
+                print(f"  ✗ Batch {batch_num} failed: {embeddings}")
+            else:
+                if verbose:
+                    print(f"Batch {batch_num}/{batch_count} ({progress:.1f}%): "
+                          f"Embedded {batch_end - batch_idx} chunks")
+                pending_ids.extend(all_ids[batch_idx:batch_end])
+                pending_embeddings.extend(embeddings)
+                pending_texts.extend(all_chunks[batch_idx:batch_end])
+                pending_metas.extend(all_metadatas[batch_idx:batch_end])
+
+            if progress_bar is not None:
+                progress_bar.update(batch_end - batch_idx)
+
+            # Store in ChromaDB once enough chunks have accumulated
+            if len(pending_ids) >= upsert_batch:
+                flush()
+
+    flush()
+    if progress_bar is not None:
+        progress_bar.close()
 
     total_time = time.time() - start_time
 
@@ -383,8 +539,15 @@ def main():
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=8,
-        help="Chunks per batch (default: 8)"
+        default=96,
+        help="Chunks per embedding request (default: 96)"
+    )
+
+    parser.add_argument(
+        "--upsert-batch",
+        type=int,
+        default=200,
+        help="Chunks written to ChromaDB per upsert (default: 200)"
     )
 
     parser.add_argument(
@@ -393,6 +556,24 @@ def main():
         help="Reset collection before vectorizing"
     )
 
+    parser.add_argument(
+        "--fast-ingest",
+        action="store_true",
+        help="Disable SQLite journaling/fsync while writing (unsafe if the run crashes)"
+    )
+
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print per-batch progress detail instead of progress bars"
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip chunks whose ids are already indexed and add only the rest"
+    )
+
     parser.add_argument(
         "--pause",
         type=float,
@@ -400,6 +581,33 @@ def main():
         help="Pause between batches (default: 0.1s)"
     )
 
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Max gloss/embedding requests in flight at once (default: 8)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes loading and chunking articles (default: CPU count)"
+    )
+
+    parser.add_argument(
+        "--gloss-cache",
+        type=Path,
+        default=DEFAULT_GLOSS_CACHE,
+        help=f"SQLite file caching glosses across runs (default: {DEFAULT_GLOSS_CACHE})"
+    )
+
+    parser.add_argument(
+        "--no-gloss-cache",
+        action="store_true",
+        help="Always regenerate glosses (don't read or write the gloss cache)"
+    )
+
     args = parser.parse_args()
 
     print("\n" + "="*70)
@@ -433,6 +641,10 @@ def main():
             pass
 
     collection = client.get_or_create_collection(name=args.collection)
+    if args.fast_ingest and enable_fast_ingest(collection):
+        print("⚠ --fast-ingest: SQLite journaling and fsync are off; if this run crashes, rebuild the index with --reset")
+
+    gloss_cache = None if args.no_gloss_cache else GlossCache(args.gloss_cache)
 
     # Vectorize
     try:
@@ -440,7 +652,13 @@ def main():
             catalog_builder,
             collection,
             batch_size=args.batch_size,
-            pause=args.pause
+            pause=args.pause,
+            concurrency=args.concurrency,
+            gloss_cache=gloss_cache,
+            upsert_batch=args.upsert_batch,
+            workers=args.workers,
+            resume=args.resume,
+            verbose=args.verbose,
         )
 
         print("\n" + "="*70)
@@ -469,6 +687,9 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        if gloss_cache is not None:
+            gloss_cache.close()
 
 
 if __name__ == "__main__":
@@ -39,6 +39,7 @@ Usage:
 from .metadata_parser import parse_metadata, extract_metadata_block, MetadataError
 from .article_extractor import Article, extract_articles, build_relationship_graph
 from .builder import CatalogBuilder
+from .term_matcher import TermMatcher
 
 __all__ = [
     "parse_metadata",
@@ -48,6 +49,7 @@ __all__ = [
     "extract_articles",
     "build_relationship_graph",
     "CatalogBuilder",
+    "TermMatcher",
 ]
 
 __version__ = "1.0.0"
@@ -17,6 +17,15 @@ from typing import Dict, List, Optional, Tuple
 
 from .metadata_parser import parse_metadata, extract_metadata_block, MetadataError
 
+# Metadata blocks and headings in one pattern, so a single finditer pass
+# yields both in document order
+_TOKEN_RE = re.compile(
+    r'(?P<meta><!--\s*METADATA\s*\n(?s:.*?)\n\s*-->)'
+    r'|(?P<head>^(?P<hashes>#{1,6})\s+(?P<title>.+)$)',
+    re.MULTILINE | re.IGNORECASE,
+)
+_IMAGE_RE = re.compile(r'!\[.*?\]\(([^\)]+)\)')
+
 
 @dataclass
 class Article:
@@ -124,78 +133,56 @@ def _parse_all_sections(markdown_content: str) -> List[Dict]:
     """
     sections = []
 
-    # Find all headings with their positions
-    heading_pattern = r'^(#{1,6})\s+(.+)$'
-    heading_matches = list(re.finditer(heading_pattern, markdown_content, re.MULTILINE))
+    # Walk metadata blocks and headings in document order, recording for each
+    # heading the closest metadata block since the previous heading and the
+    # first metadata block after it (which ends its section)
+    headings = []  # (heading match, metadata match or None)
+    metadata_after = []  # start of first metadata block after each heading
+    last_metadata = None
+    for token in _TOKEN_RE.finditer(markdown_content):
+        if token.lastgroup == 'meta':
+            if headings and metadata_after[-1] is None:
+                metadata_after[-1] = token.start()
+            last_metadata = token
+        else:
+            headings.append((token, last_metadata))
+            metadata_after.append(None)
+            last_metadata = None
 
-    if not heading_matches:
+    if not headings:
         return []
 
-    # For each heading, extract its section content
-    for i, heading_match in enumerate(heading_matches):
-        level = len(heading_match.group(1))
-        heading_text = heading_match.group(2).strip()
+    for i, (heading_match, metadata_match) in enumerate(headings):
+        level = len(heading_match.group('hashes'))
+        heading_text = heading_match.group('title').strip()
         heading_start = heading_match.start()
 
-        # Find end of this section
-        if i + 1 < len(heading_matches):
-            next_heading_start = heading_matches[i + 1].start()
-
-            # Check if there's a metadata block before the next heading
-            # If so, end current section before that metadata
-            search_area = markdown_content[heading_start:next_heading_start]
-            metadata_pattern_end = r'<!--\s*METADATA\s*\n.*?\n\s*-->'
-            metadata_matches_in_section = list(re.finditer(metadata_pattern_end, search_area, re.DOTALL | re.IGNORECASE))
-
-            if metadata_matches_in_section:
-                # End current section just before the first metadata block found
-                section_end = heading_start + metadata_matches_in_section[0].start()
-            else:
-                # No metadata found, end at next heading
-                section_end = next_heading_start
+        # Section ends before the next metadata block or at the next heading;
+        # the last section runs to the end of the document
+        if i + 1 < len(headings):
+            section_end = metadata_after[i]
+            if section_end is None:
+                section_end = headings[i + 1][0].start()
         else:
             section_end = len(markdown_content)
 
-        # Check if there's a metadata block BEFORE this heading
-        # Look backwards from heading to find metadata
-        search_start = max(0, heading_start - 500)  # Look back max 500 chars
+        # The closest metadata block since the previous heading belongs to
+        # this heading, however far back it starts
         section_start = heading_start
         metadata_dict = None
         has_metadata = False
-
-        # Search for metadata block before this heading
-        # Use finditer to find ALL matches, then take the LAST (closest) one
-        metadata_pattern = r'<!--\s*METADATA\s*\n(.*?)\n\s*-->'
-        content_before = markdown_content[search_start:heading_start]
-        metadata_matches = list(re.finditer(metadata_pattern, content_before, re.DOTALL | re.IGNORECASE))
-
-        # Take the last (closest) metadata block
-        if metadata_matches:
-            metadata_match = metadata_matches[-1]
-
-            # Check if there's another heading between metadata and this heading
-            metadata_end = search_start + metadata_match.end()
-            text_between = markdown_content[metadata_end:heading_start]
-
-            # If there's another heading in between, metadata doesn't belong to this heading
-            if re.search(r'^#{1,6}\s+', text_between, re.MULTILINE):
+        if metadata_match is not None:
+            section_start = metadata_match.start()
+            has_metadata = True
+
+            # Parse the metadata
+            try:
+                metadata_dict = parse_metadata(metadata_match.group(0))
+            except:
+                # Invalid metadata, treat as no metadata
                 has_metadata = False
                 metadata_dict = None
                 section_start = heading_start
-            else:
-                # Found metadata right before this heading (no intervening headings)
-                metadata_block_start = search_start + metadata_match.start()
-                section_start = metadata_block_start
-                has_metadata = True
-
-                # Parse the metadata
-                try:
-                    metadata_dict = parse_metadata(metadata_match.group(0))
-                except:
-                    # Invalid metadata, treat as no metadata
-                    has_metadata = False
-                    metadata_dict = None
-                    section_start = heading_start
 
         # Extract full section content
         section_content = markdown_content[section_start:section_end].strip()
@@ -227,7 +214,10 @@ def _build_articles_from_sections(sections: List[Dict], source_file: str) -> Lis
         List of Article objects
     """
     articles = []
-    stack = []  # Stack of (level, article) tuples
+    articles_by_id: Dict[str, Article] = {}
+    # Content pieces per article (parallel to articles), joined once at the end
+    content_parts: List[List[str]] = []
+    stack = []  # Stack of (level, article, content parts) tuples
 
     for section in sections:
         level = section['level']
@@ -269,16 +259,16 @@ def _build_articles_from_sections(sections: List[Dict], source_file: str) -> Lis
             )
 
             articles.append(article)
+            parts = [content]
+            content_parts.append(parts)
 
-            # Update parent's children list
+            # Update parent's children list (first article with that id)
             if parent_id:
-                for a in articles:
-                    if a.id == parent_id:
-                        a.children_ids.append(article.id)
-                        break
+                articles_by_id[parent_id].children_ids.append(article.id)
+            articles_by_id.setdefault(article.id, article)
 
             # Push to stack
-            stack.append((level, article))
+            stack.append((level, article, parts))
 
         else:
             # No metadata - append to current parent
@@ -287,7 +277,7 @@ def _build_articles_from_sections(sections: List[Dict], source_file: str) -> Lis
                 stack.pop()
 
             if stack:
-                parent_article = stack[-1][1]
+                _, parent_article, parent_parts = stack[-1]
 
                 # Reconstruct section with heading (preserve structure)
                 section_heading = f"{'#' * level} {heading}"
@@ -301,7 +291,7 @@ def _build_articles_from_sections(sections: List[Dict], source_file: str) -> Lis
                     section_text = f"\n\n{content}"
 
                 # Append to parent article
-                parent_article.content += section_text
+                parent_parts.append(section_text)
 
                 # Extract and add images from this section
                 section_images = _extract_images(content)
@@ -311,6 +301,10 @@ def _build_articles_from_sections(sections: List[Dict], source_file: str) -> Lis
                 # Orphan section at root level (no parent to append to)
                 print(f"⚠ Warning: Section '{heading}' at level {level} has no metadata and no parent - skipping")
 
+    for article, parts in zip(articles, content_parts):
+        if len(parts) > 1:
+            article.content = "".join(parts)
+
     return articles
 
 
@@ -324,9 +318,7 @@ def _extract_images(content: str) -> List[str]:
         List of image paths
     """
     # Find all markdown image syntax: ![alt](path)
-    pattern = r'!\[.*?\]\(([^\)]+)\)'
-    matches = re.findall(pattern, content)
-    return matches
+    return _IMAGE_RE.findall(content)
 
 
 def build_relationship_graph(articles: List[Article]) -> Dict:
@@ -12,11 +12,42 @@ from __future__ import annotations
 
 import json
 import shutil
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .article_extractor import Article, extract_articles, build_relationship_graph
+from .term_matcher import BoostTerms, TermMatcher, build_boost_index
+
+
+def _write_json(path: Path, data: Dict) -> None:
+    """Write data as indented UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+def _read_json(path: Path) -> Dict:
+    """Read a JSON file (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
 
 class CatalogBuilder:
@@ -33,9 +64,84 @@ class CatalogBuilder:
         self.catalog_file = self.catalog_dir / "catalog.json"
         self.relationships_file = self.catalog_dir / "relationships.json"
 
+        # Lazily loaded catalog index, relationship graph and synonym/code
+        # matcher; the JSON files are re-read only when their mtime/size change
+        self._catalog: Optional[Dict] = None
+        self._catalog_stamp: Optional[Tuple[int, int]] = None
+        self._relationships: Optional[Dict] = None
+        self._relationships_stamp: Optional[Tuple[int, int]] = None
+        self._boost_index: Optional[Dict[str, BoostTerms]] = None
+        self._term_matcher: Optional[TermMatcher] = None
+
         # Create directories
         self.articles_dir.mkdir(parents=True, exist_ok=True)
 
+    @property
+    def catalog(self) -> Dict:
+        """Catalog index data (catalog.json), reloaded when the file changes.
+
+        Returns:
+            Catalog data dictionary, or empty dict if catalog not built
+        """
+        return self._load_catalog() or {}
+
+    def _load_catalog(self) -> Optional[Dict]:
+        """Return the cached catalog index, re-reading catalog.json if it changed.
+
+        Returns:
+            Catalog data dictionary, or None if catalog not built
+        """
+        stamp = _file_stamp(self.catalog_file)
+        if stamp is None:
+            if self._catalog is not None:
+                self._invalidate()
+            return None
+        if self._catalog is None or stamp != self._catalog_stamp:
+            # Derived indexes were built from the old data
+            self._boost_index = None
+            self._term_matcher = None
+            self._catalog = _read_json(self.catalog_file)
+            self._catalog_stamp = stamp
+        return self._catalog
+
+    def _load_relationships(self) -> Optional[Dict]:
+        """Return the cached relationship graph, re-reading it if it changed.
+
+        Returns:
+            Relationship graph dictionary, or None if not built
+        """
+        stamp = _file_stamp(self.relationships_file)
+        if stamp is None:
+            self._relationships = None
+            return None
+        if self._relationships is None or stamp != self._relationships_stamp:
+            self._relationships = _read_json(self.relationships_file)
+            self._relationships_stamp = stamp
+        return self._relationships
+
+    @property
+    def boost_index(self) -> Dict[str, BoostTerms]:
+        """Article id -> (lowercased synonyms, uppercased codes), built on first access."""
+        if self._boost_index is None:
+            self._boost_index = build_boost_index(self.catalog)
+        return self._boost_index
+
+    @property
+    def term_matcher(self) -> TermMatcher:
+        """Matcher over all article synonyms and codes, built on first access."""
+        if self._term_matcher is None:
+            self._term_matcher = TermMatcher.from_boost_index(self.boost_index)
+        return self._term_matcher
+
+    def _invalidate(self) -> None:
+        """Drop cached catalog data after it changes on disk."""
+        self._catalog = None
+        self._catalog_stamp = None
+        self._relationships = None
+        self._relationships_stamp = None
+        self._boost_index = None
+        self._term_matcher = None
+
     def build_from_markdown(self, source_md_path: Path, clean_existing: bool = False) -> Dict:
         """Build catalog from a markdown file.
 
@@ -51,14 +157,39 @@ class CatalogBuilder:
             >>> stats = builder.build_from_markdown(Path("md/manual.md"))
             >>> print(f"Extracted {stats['articles_count']} articles")
         """
-        if clean_existing:
-            self._clean_catalog()
-
         # Read source markdown
         if not source_md_path.exists():
             raise FileNotFoundError(f"Source file not found: {source_md_path}")
 
-        content = source_md_path.read_text(encoding='utf-8')
+        return self.build_from_bytes(
+            source_md_path, source_md_path.read_bytes(), clean_existing=clean_existing
+        )
+
+    def build_from_bytes(
+        self, source_md_path: Path, data, clean_existing: bool = False
+    ) -> Dict:
+        """Build catalog from already-loaded markdown bytes.
+
+        Lets callers hand over a memory-mapped file instead of having the
+        builder re-open and re-read it.
+
+        Args:
+            source_md_path: Path of the source markdown file (used for the
+                catalog source field and for locating image directories)
+            data: UTF-8 markdown content (bytes, memoryview or mmap)
+            clean_existing: If True, remove existing catalog first
+
+        Returns:
+            Dictionary with build statistics
+        """
+        if clean_existing:
+            self._clean_catalog()
+
+        # Release the view before the caller closes the mmap
+        with memoryview(data) as view:
+            content = str(view, 'utf-8')
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
 
         # Extract articles
         articles = extract_articles(content, str(source_md_path))
@@ -151,10 +282,8 @@ class CatalogBuilder:
         Args:
             catalog_data: Catalog data dictionary
         """
-        self.catalog_file.write_text(
-            json.dumps(catalog_data, indent=2, ensure_ascii=False),
-            encoding='utf-8'
-        )
+        _write_json(self.catalog_file, catalog_data)
+        self._invalidate()
 
     def _save_relationships(self, relationships: Dict) -> None:
         """Save relationship graph to JSON.
@@ -166,10 +295,8 @@ class CatalogBuilder:
         relationships["version"] = "1.0"
         relationships["created_at"] = datetime.now().isoformat()
 
-        self.relationships_file.write_text(
-            json.dumps(relationships, indent=2, ensure_ascii=False),
-            encoding='utf-8'
-        )
+        _write_json(self.relationships_file, relationships)
+        self._invalidate()
 
     def _clean_catalog(self) -> None:
         """Remove existing catalog files."""
@@ -183,6 +310,8 @@ class CatalogBuilder:
         if self.relationships_file.exists():
             self.relationships_file.unlink()
 
+        self._invalidate()
+
     def _copy_images(self, source_md_path: Path) -> None:
         """Copy image directories from source directory to catalog articles directory.
 
@@ -220,11 +349,7 @@ class CatalogBuilder:
         Returns:
             Dictionary of counts
         """
-        counts = {}
-        for article in articles:
-            value = getattr(article, field)
-            counts[value] = counts.get(value, 0) + 1
-        return counts
+        return dict(Counter(getattr(article, field) for article in articles))
 
     def get_article(self, article_id: str) -> Dict:
         """Get article by ID from catalog.
@@ -239,11 +364,10 @@ class CatalogBuilder:
             FileNotFoundError: If article not found
         """
         # Load catalog
-        if not self.catalog_file.exists():
+        catalog = self._load_catalog()
+        if catalog is None:
             raise FileNotFoundError("Catalog not found. Build catalog first.")
 
-        catalog = json.loads(self.catalog_file.read_text(encoding='utf-8'))
-
         if article_id not in catalog["articles"]:
             raise KeyError(f"Article '{article_id}' not found in catalog")
 
@@ -276,11 +400,10 @@ class CatalogBuilder:
             >>> builder.search_articles(intent='do', category='application')
             [{'id': 'editing_palette', 'title': 'Editing Palette', ...}]
         """
-        if not self.catalog_file.exists():
+        catalog = self._load_catalog()
+        if catalog is None:
             return []
 
-        catalog = json.loads(self.catalog_file.read_text(encoding='utf-8'))
-
         results = []
         for article_id, article_meta in catalog["articles"].items():
             # Check if all filters match
@@ -307,16 +430,17 @@ class CatalogBuilder:
                 "siblings": [{...}, ...]
             }
         """
-        if not self.relationships_file.exists():
+        relationships = self._load_relationships()
+        if relationships is None:
             return {}
 
-        relationships = json.loads(self.relationships_file.read_text(encoding='utf-8'))
-
         if article_id not in relationships["articles"]:
             return {}
 
         article_rel = relationships["articles"][article_id]
-        catalog = json.loads(self.catalog_file.read_text(encoding='utf-8'))
+        catalog = self._load_catalog()
+        if catalog is None:
+            return {}
 
         related = {
             "parent": None,
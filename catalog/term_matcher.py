@@ -0,0 +1,143 @@
+"""
+Synonym/code matcher for ManualBook catalog.
+
+Compiles every article's synonyms and codes into Aho-Corasick automata so a
+query can be matched against the whole catalog in a single O(len(query)) pass.
+
+Matching keeps the original substring semantics:
+- synonyms are matched case-insensitively against the lowercased query
+- codes are matched case-insensitively against the uppercased query
+
+If pyahocorasick is not installed, falls back to a per-term substring scan
+(still once per query rather than once per retrieved result).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, Set, Tuple
+
+try:
+    import ahocorasick  # pyahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Per-article match terms: (lowercased synonyms, uppercased codes)
+BoostTerms = Tuple[FrozenSet[str], FrozenSet[str]]
+
+
+def build_boost_index(catalog_data: Dict) -> Dict[str, BoostTerms]:
+    """Precompute each article's normalized synonyms and codes.
+
+    Args:
+        catalog_data: Catalog JSON data with article metadata
+
+    Returns:
+        Article id -> (lowercased synonyms, uppercased codes)
+    """
+    articles = (catalog_data or {}).get("articles", {})
+    return {
+        article_id: (
+            frozenset(syn.lower() for syn in meta.get("synonyms") or []),
+            frozenset(code.upper() for code in meta.get("codes") or []),
+        )
+        for article_id, meta in articles.items()
+    }
+
+
+def _build_index(terms: Iterable[Tuple[str, str]]) -> Dict[str, FrozenSet[str]]:
+    """Group (term, article_id) pairs into term -> article ids."""
+    index: Dict[str, Set[str]] = {}
+    for term, article_id in terms:
+        if term:
+            index.setdefault(term, set()).add(article_id)
+    return {term: frozenset(ids) for term, ids in index.items()}
+
+
+class _TermSet:
+    """Set of terms that can report which article ids occur in a text."""
+
+    def __init__(self, index: Dict[str, FrozenSet[str]]):
+        self._index = index
+        self._automaton = None
+
+        if ahocorasick is not None and index:
+            automaton = ahocorasick.Automaton()
+            for term, ids in index.items():
+                automaton.add_word(term, ids)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def match(self, text: str) -> Set[str]:
+        matched: Set[str] = set()
+        if self._automaton is not None:
+            for _, ids in self._automaton.iter(text):
+                matched |= ids
+        else:
+            for term, ids in self._index.items():
+                if term in text:
+                    matched |= ids
+        return matched
+
+
+class TermMatcher:
+    """Matches queries against all catalog synonyms and codes at once."""
+
+    def __init__(
+        self,
+        synonyms: Dict[str, FrozenSet[str]],
+        codes: Dict[str, FrozenSet[str]],
+    ):
+        """Initialize matcher.
+
+        Args:
+            synonyms: Lowercased synonym -> article ids
+            codes: Uppercased code -> article ids
+        """
+        self._synonyms = _TermSet(synonyms)
+        self._codes = _TermSet(codes)
+
+    @classmethod
+    def from_catalog(cls, catalog_data: Dict) -> "TermMatcher":
+        """Build matcher from catalog.json data.
+
+        Args:
+            catalog_data: Catalog JSON data with article metadata
+
+        Returns:
+            TermMatcher over every article's synonyms and codes
+        """
+        return cls.from_boost_index(build_boost_index(catalog_data))
+
+    @classmethod
+    def from_boost_index(cls, boost_index: Dict[str, BoostTerms]) -> "TermMatcher":
+        """Build matcher from a precomputed per-article boost index.
+
+        Args:
+            boost_index: Article id -> (lowercased synonyms, uppercased codes)
+
+        Returns:
+            TermMatcher over every article's synonyms and codes
+        """
+        synonyms = _build_index(
+            (syn, article_id)
+            for article_id, (syns, _) in boost_index.items()
+            for syn in syns
+        )
+        codes = _build_index(
+            (code, article_id)
+            for article_id, (_, codes) in boost_index.items()
+            for code in codes
+        )
+        return cls(synonyms, codes)
+
+    def match(self, query: str) -> Tuple[Set[str], Set[str]]:
+        """Find articles whose synonyms or codes occur in the query.
+
+        Args:
+            query: User query string
+
+        Returns:
+            Tuple of (article ids matched by synonym, article ids matched by code)
+        """
+        return self._synonyms.match(query.lower()), self._codes.match(query.upper())
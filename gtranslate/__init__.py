@@ -4,6 +4,6 @@ Google services for ManualBook system.
 This module provides centralized access to Google services including translation.
 """
 
-from .translate_service import translate_text
+from .translate_service import RateLimiter, install_shared_session, translate_text
 
-__all__ = ["translate_text"]
+__all__ = ["RateLimiter", "install_shared_session", "translate_text"]
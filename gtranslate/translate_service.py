@@ -17,9 +17,19 @@ Usage:
 from __future__ import annotations
 
 import logging
+import sys
+import threading
 import time
 from typing import Optional
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ModuleNotFoundError as exc:
+    raise SystemExit(
+        "Missing dependency 'requests'. Install it with 'pip install requests' and retry."
+    ) from exc
+
 try:
     from deep_translator import GoogleTranslator
 except ModuleNotFoundError as exc:
@@ -34,6 +44,7 @@ logger = logging.getLogger(__name__)
 DEFAULT_SOURCE_LANGUAGE = "auto"
 DEFAULT_TARGET_LANGUAGE = "en"
 DEFAULT_DELAY = 0.1  # Small delay between translations to avoid rate limiting
+DEFAULT_POOL_SIZE = 16  # Keep-alive connections kept open by the shared session
 
 
 class TranslationError(RuntimeError):
@@ -41,6 +52,57 @@ class TranslationError(RuntimeError):
     pass
 
 
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class _SessionRequests:
+    """Stand-in for the requests module whose get() goes through a shared Session."""
+
+    def __init__(self, session: requests.Session):
+        self.get = session.get
+
+    def __getattr__(self, name: str):
+        return getattr(requests, name)
+
+
+def install_shared_session(pool_size: int = DEFAULT_POOL_SIZE) -> None:
+    """Reuse pooled keep-alive connections for all Google Translate calls.
+
+    deep-translator calls requests.get() directly, which opens a new
+    connection (and TLS handshake) per call, and has no session hook.
+    Its backend module's requests reference is pointed at a shared Session
+    instead. Only the first call has an effect; nothing is changed if the
+    backend does not look as expected.
+
+    Args:
+        pool_size: Connections to keep open (at least the number of worker threads)
+    """
+    backend = sys.modules.get(GoogleTranslator.__module__)
+    if backend is None or getattr(backend, "requests", None) is not requests:
+        return
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    backend.requests = _SessionRequests(session)
+
+
 def translate_text(
     text: str,
     source: str = DEFAULT_SOURCE_LANGUAGE,
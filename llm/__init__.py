@@ -8,21 +8,25 @@ embeddings, completions, translations, and glossing.
 from .service import (
     LLMServiceError,
     get_completion,
+    get_completion_stream,
     get_embeddings,
     get_gloss,
     get_provider_info,
     translate_text,
     generate_answer,
+    generate_answer_stream,
     test_connection,
 )
 
 __all__ = [
     "LLMServiceError",
     "get_completion",
+    "get_completion_stream",
     "get_embeddings",
     "get_gloss",
     "get_provider_info",
     "translate_text",
     "generate_answer",
+    "generate_answer_stream",
     "test_connection",
 ]
@@ -20,6 +20,10 @@ Usage:
         temperature=0.7
     )
 
+    # Stream LLM completion chunks as they arrive
+    for chunk in get_completion_stream("What is AI?"):
+        print(chunk, end="")
+
     # Get one-line gloss/summary
     gloss = get_gloss("Long document text here...")
 """
@@ -30,7 +34,7 @@ import json
 import logging
 import os
 import time
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import requests
 
@@ -54,6 +58,9 @@ OPENAI_API_KEY = os.environ.get("EMBEDDING_API_KEY", "hzrMSv-yoj2lrvSgr7nnyWvX_a
 OPENAI_EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "text-embedding-nomic-embed-text-v1.5")
 OPENAI_LLM_MODEL = os.environ.get("LLM_MODEL", "qwen2.5-32b-instruct-mlx")
 
+# Most inputs sent in one embeddings request; larger lists are split
+EMBED_MAX_BATCH = int(os.environ.get("EMBED_MAX_BATCH", "96"))
+
 # Retry configuration
 RETRY_LIMIT = int(os.environ.get("LLM_RETRY_LIMIT", "3"))
 RETRY_BACKOFF = float(os.environ.get("LLM_RETRY_BACKOFF", "2.0"))
@@ -69,6 +76,11 @@ class LLMServiceError(RuntimeError):
     pass
 
 
+class _MalformedStreamError(LLMServiceError):
+    """A server-sent event whose payload is not valid JSON (retried like a network error)."""
+    pass
+
+
 # ============================================================================
 # Helper functions
 # ============================================================================
@@ -112,6 +124,9 @@ def get_embeddings(texts: List[str]) -> List[List[float]]:
     """
     Get embeddings for a list of texts.
 
+    Repeated texts are embedded once, and lists longer than EMBED_MAX_BATCH
+    are split into provider-sized requests; results come back in input order.
+
     Args:
         texts: List of strings to embed
 
@@ -124,6 +139,24 @@ def get_embeddings(texts: List[str]) -> List[List[float]]:
     if not texts:
         return []
 
+    unique = list(dict.fromkeys(texts))
+    if len(unique) <= EMBED_MAX_BATCH:
+        embeddings = _get_embeddings_batch(unique)
+    else:
+        embeddings = []
+        for start in range(0, len(unique), EMBED_MAX_BATCH):
+            embeddings.extend(_get_embeddings_batch(unique[start:start + EMBED_MAX_BATCH]))
+
+    if len(unique) == len(texts):
+        return embeddings
+
+    # Scatter the unique results back over the duplicates
+    by_text = dict(zip(unique, embeddings))
+    return [by_text[text] for text in texts]
+
+
+def _get_embeddings_batch(texts: List[str]) -> List[List[float]]:
+    """Get embeddings for at most EMBED_MAX_BATCH texts in one request, with retries."""
     logger.debug(f"Getting embeddings for {len(texts)} texts using {API_PROVIDER} provider")
 
     for attempt in range(1, RETRY_LIMIT + 1):
@@ -208,33 +241,28 @@ def _get_embedding_via_chat_openai(text: str) -> List[float]:
 
 
 def _get_embeddings_cloudflare(texts: List[str]) -> List[List[float]]:
-    """Get embeddings using Cloudflare AI Workers."""
+    """Get embeddings using Cloudflare AI Workers (all texts in one request)."""
     url = _cloudflare_url(CLOUDFLARE_EMBEDDING_MODEL)
-    embeddings = []
-
-    for text in texts:
-        payload = {"text": [text]}
-
-        response = requests.post(url, headers=_cloudflare_headers(), json=payload, timeout=120)
+    payload = {"text": texts}
 
-        if response.status_code >= 400:
-            raise LLMServiceError(
-                f"Cloudflare embeddings error {response.status_code}: {response.text}"
-            )
+    response = requests.post(url, headers=_cloudflare_headers(), json=payload, timeout=120)
 
-        data = response.json()
+    if response.status_code >= 400:
+        raise LLMServiceError(
+            f"Cloudflare embeddings error {response.status_code}: {response.text}"
+        )
 
-        # Cloudflare response: {"result": {"shape": [1, dim], "data": [[...]]}}
-        if "result" not in data or "data" not in data["result"]:
-            raise LLMServiceError(f"Unexpected Cloudflare response format: {data}")
+    data = response.json()
 
-        embedding_data = data["result"]["data"]
-        if not embedding_data or not isinstance(embedding_data[0], list):
-            raise LLMServiceError(f"Invalid embedding data: {embedding_data}")
+    # Cloudflare response: {"result": {"shape": [n, dim], "data": [[...], ...]}}
+    if "result" not in data or "data" not in data["result"]:
+        raise LLMServiceError(f"Unexpected Cloudflare response format: {data}")
 
-        embeddings.append(embedding_data[0])
+    embedding_data = data["result"]["data"]
+    if len(embedding_data) != len(texts) or not isinstance(embedding_data[0], list):
+        raise LLMServiceError(f"Invalid embedding data: {embedding_data}")
 
-    return embeddings
+    return embedding_data
 
 
 # ============================================================================
@@ -354,6 +382,148 @@ def _get_completion_cloudflare(
     return data["result"]["response"].strip()
 
 
+def get_completion_stream(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    temperature: float = 0.2,
+    max_tokens: int = 512,
+) -> Iterator[str]:
+    """
+    Stream a text completion from the LLM, yielding text chunks as they arrive.
+
+    Retries only while nothing has been yielded yet; a connection lost mid-stream
+    raises instead of restarting the answer.
+
+    Args:
+        prompt: User prompt/question
+        system_prompt: Optional system prompt to guide the model
+        temperature: Sampling temperature (0.0 = deterministic, 1.0 = creative)
+        max_tokens: Maximum tokens to generate
+
+    Yields:
+        Generated text chunks (leading whitespace of the answer is stripped)
+
+    Raises:
+        LLMServiceError: If the request fails after retries or is interrupted
+    """
+    logger.debug(f"Streaming completion using {API_PROVIDER} provider (temp={temperature}, max_tokens={max_tokens})")
+
+    for attempt in range(1, RETRY_LIMIT + 1):
+        started = False
+        try:
+            if API_PROVIDER == "cloudflare":
+                chunks = _stream_completion_cloudflare(prompt, system_prompt, temperature, max_tokens)
+            else:
+                chunks = _stream_completion_openai(prompt, system_prompt, temperature, max_tokens)
+
+            for chunk in chunks:
+                if not started:
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                    started = True
+                yield chunk
+            return
+
+        except (requests.RequestException, _MalformedStreamError) as exc:
+            if started:
+                raise LLMServiceError(f"Completion stream interrupted: {exc}") from exc
+            logger.warning(f"Streaming completion attempt {attempt} failed: {exc}")
+            if attempt == RETRY_LIMIT:
+                raise LLMServiceError(
+                    f"Failed to get completion after {RETRY_LIMIT} attempts: {exc}"
+                ) from exc
+            time.sleep(RETRY_BACKOFF * attempt)
+
+
+def _iter_sse_data(response: requests.Response) -> Iterator[Dict]:
+    """Yield the JSON payload of each `data:` line in a server-sent event stream."""
+    for line in response.iter_lines():
+        if not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            return
+        if not data:
+            continue
+        try:
+            event = json.loads(data)
+        except ValueError as exc:
+            raise _MalformedStreamError(f"Malformed stream event: {data[:200]!r}") from exc
+        yield event
+
+
+def _stream_completion_openai(
+    prompt: str,
+    system_prompt: Optional[str],
+    temperature: float,
+    max_tokens: int,
+) -> Iterator[str]:
+    """Stream completion using OpenAI-compatible API."""
+    url = OPENAI_API_BASE.rstrip("/") + "/chat/completions"
+
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+
+    payload = {
+        "model": OPENAI_LLM_MODEL,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+
+    with requests.post(url, headers=_openai_headers(), json=payload, timeout=180, stream=True) as response:
+        if response.status_code >= 400:
+            raise LLMServiceError(
+                f"OpenAI completion error {response.status_code}: {response.text}"
+            )
+
+        # OpenAI stream: data: {"choices": [{"delta": {"content": "..."}}]}
+        for data in _iter_sse_data(response):
+            choices = data.get("choices") or []
+            if choices:
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    yield content
+
+
+def _stream_completion_cloudflare(
+    prompt: str,
+    system_prompt: Optional[str],
+    temperature: float,
+    max_tokens: int,
+) -> Iterator[str]:
+    """Stream completion using Cloudflare AI Workers."""
+    url = _cloudflare_url(CLOUDFLARE_LLM_MODEL)
+
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+
+    payload = {
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+
+    with requests.post(url, headers=_cloudflare_headers(), json=payload, timeout=180, stream=True) as response:
+        if response.status_code >= 400:
+            raise LLMServiceError(
+                f"Cloudflare completion error {response.status_code}: {response.text}"
+            )
+
+        # Cloudflare stream: data: {"response": "..."}
+        for data in _iter_sse_data(response):
+            content = data.get("response")
+            if content:
+                yield content
+
+
 # ============================================================================
 # Specialized Functions
 # ============================================================================
@@ -426,25 +596,12 @@ def translate_text(
     )
 
 
-def generate_answer(
+def _answer_prompts(
     query: str,
     context: str,
-    sources: Optional[List[Dict[str, str]]] = None,
-) -> str:
-    """
-    Generate an answer to a query using provided context.
-
-    Args:
-        query: The user's question
-        context: Relevant context/documentation
-        sources: Optional list of source metadata
-
-    Returns:
-        Generated answer
-
-    Raises:
-        LLMServiceError: If the request fails
-    """
+    sources: Optional[List[Dict[str, str]]],
+) -> Tuple[str, str]:
+    """Build the (system prompt, user prompt) pair for answering a query."""
     system_prompt = (
         "You are a helpful assistant that produces concise, factual answers. "
         "Use the supplied context to answer the user's query. Cite relevant sections "
@@ -465,6 +622,29 @@ def generate_answer(
         f"User question: {query}\n\n"
         f"Respond with a helpful answer."
     )
+    return system_prompt, full_prompt
+
+
+def generate_answer(
+    query: str,
+    context: str,
+    sources: Optional[List[Dict[str, str]]] = None,
+) -> str:
+    """
+    Generate an answer to a query using provided context.
+
+    Args:
+        query: The user's question
+        context: Relevant context/documentation
+        sources: Optional list of source metadata
+
+    Returns:
+        Generated answer
+
+    Raises:
+        LLMServiceError: If the request fails
+    """
+    system_prompt, full_prompt = _answer_prompts(query, context, sources)
 
     return get_completion(
         prompt=full_prompt,
@@ -474,6 +654,37 @@ def generate_answer(
     )
 
 
+def generate_answer_stream(
+    query: str,
+    context: str,
+    sources: Optional[List[Dict[str, str]]] = None,
+) -> Iterator[str]:
+    """
+    Stream an answer to a query using provided context.
+
+    Same prompt as generate_answer(), but yields text chunks as the LLM produces them.
+
+    Args:
+        query: The user's question
+        context: Relevant context/documentation
+        sources: Optional list of source metadata
+
+    Yields:
+        Answer text chunks
+
+    Raises:
+        LLMServiceError: If the request fails
+    """
+    system_prompt, full_prompt = _answer_prompts(query, context, sources)
+
+    yield from get_completion_stream(
+        prompt=full_prompt,
+        system_prompt=system_prompt,
+        temperature=0.2,
+        max_tokens=512,
+    )
+
+
 # ============================================================================
 # Utility Functions
 # ============================================================================